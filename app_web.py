@@ -4,33 +4,114 @@ WeatherWear Flask Web Application
 Run this to access WeatherWear via web browser at http://localhost:5000
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request
 import os
-import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import traceback
-import re
+import orjson
+from functools import lru_cache
+from waitress import serve
 
-from colorama import init # Ensure this import is here
+# Import your existing modules. The script's own directory (the project root)
+# is already on sys.path when run as `python app_web.py`, so src/ is importable.
+from src.outfit_generator import OutfitGenerator
+from src.utils import validate_style_preference, init_colorama
 
-# Initialize Colorama for proper ANSI code handling across the application.
-# This must be called early to ensure colorama translates its constants
-# into actual ANSI escape sequences (e.g., \x1b[36m) for all output.
-init()
+app = Flask(__name__)
 
-# Load environment variables from .env file
-load_dotenv()
+@lru_cache(maxsize=1)
+def get_generator():
+    """
+    Return the shared OutfitGenerator instance.
+    Built on first use so the Groq client and its connection pool
+    are reused across requests instead of recreated on every POST.
+    """
+    # Load environment variables from .env file once, right before the
+    # API clients read them, so WSGI workers pick them up too
+    load_dotenv()
+    return OutfitGenerator()
 
-# Add project root to path to allow importing modules from src/
-project_root = Path(__file__).resolve().parent.parent
-sys.path.insert(0, str(project_root))
+# ANSI SGR codes mapped to HTML spans with CSS classes
+_CODE_TO_HTML = {
+    # Reset codes close the currently open span
+    0: '</span>',                       # Reset all attributes
+    39: '</span>',                      # Reset foreground color
+    49: '</span>',                      # Reset background color
 
-# Import your existing modules
-from src.outfit_generator import OutfitGenerator
-from src.utils import validate_style_preference
+    # Standard Foreground Colors (30-37)
+    30: '<span class="text-black">',
+    31: '<span class="text-red">',
+    32: '<span class="text-green">',
+    33: '<span class="text-yellow">',
+    34: '<span class="text-blue">',
+    35: '<span class="text-magenta">',
+    36: '<span class="text-cyan">',
+    37: '<span class="text-white">',
 
-app = Flask(__name__)
+    # Bright Foreground Colors (90-97)
+    90: '<span class="text-gray">', # Typically bright black/dark gray
+    91: '<span class="text-bright-red">',
+    92: '<span class="text-bright-green">',
+    93: '<span class="text-bright-yellow">',
+    94: '<span class="text-bright-blue">',
+    95: '<span class="text-bright-magenta">',
+    96: '<span class="text-bright-cyan">',
+    97: '<span class="text-bright-white">',
+}
+
+def _parse_sgr(text, pos, skip_spaces):
+    """
+    Parse an ANSI "XXm" code starting at pos.
+    Returns (code, end) on success or None if no code is present.
+    """
+    n = len(text)
+    if skip_spaces:
+        while pos < n and text[pos].isspace():
+            pos += 1
+    digits_end = pos
+    while digits_end < n and '0' <= text[digits_end] <= '9':
+        digits_end += 1
+    if digits_end == pos or digits_end >= n or text[digits_end] != 'm':
+        return None
+    return int(text[pos:digits_end]), digits_end + 1
+
+def _replace_ansi_codes(text):
+    """
+    Replace ANSI color codes in text with their HTML spans.
+    """
+    # Walk the text once, copying literal runs as slices and swapping each
+    # standard ANSI code (\x1b[XXm) or literal "[ XXm" fallback (with
+    # optional space, where \x1b is missing) for its HTML span.
+    # Codes that are not in _CODE_TO_HTML are left untouched.
+    out = []
+    start = 0
+    pos = 0
+    while True:
+        bracket = text.find('[', pos)
+        if bracket == -1:
+            break
+        
+        parsed = None
+        if bracket > 0 and text[bracket - 1] == '\x1b':
+            parsed = _parse_sgr(text, bracket + 1, skip_spaces=False)
+            match_start = bracket - 1
+        if parsed is None:
+            parsed = _parse_sgr(text, bracket + 1, skip_spaces=True)
+            match_start = bracket
+        if parsed is None:
+            pos = bracket + 1
+            continue
+        
+        code, pos = parsed
+        html = _CODE_TO_HTML.get(code)
+        if html is not None:
+            out.append(text[start:match_start])
+            out.append(html)
+            start = pos
+    
+    out.append(text[start:])
+    return ''.join(out)
 
 def convert_ansi_to_html(text):
     """
@@ -38,104 +119,44 @@ def convert_ansi_to_html(text):
     This function is made more robust to handle both standard ANSI codes
     and the literal "[ XXm" patterns observed in some environments.
     """
-    ansi_patterns = {
-        # Reset codes - these should generally be processed first or last
-        # depending on if they are part of a longer sequence.
-        # Placing them here to ensure they close spans.
-        r'\x1b\[0m': '</span>',                       # Reset all attributes
-        r'\x1b\[39m': '</span>',                      # Reset foreground color
-        r'\x1b\[49m': '</span>',                      # Reset background color
-
-        # Standard Foreground Colors (30-37)
-        r'\x1b\[30m': '<span class="text-black">',
-        r'\x1b\[31m': '<span class="text-red">',
-        r'\x1b\[32m': '<span class="text-green">',
-        r'\x1b\[33m': '<span class="text-yellow">',
-        r'\x1b\[34m': '<span class="text-blue">',
-        r'\x1b\[35m': '<span class="text-magenta">',
-        r'\x1b\[36m': '<span class="text-cyan">',
-        r'\x1b\[37m': '<span class="text-white">',
-
-        # Bright Foreground Colors (90-97)
-        r'\x1b\[90m': '<span class="text-gray">', # Typically bright black/dark gray
-        r'\x1b\[91m': '<span class="text-bright-red">',
-        r'\x1b\[92m': '<span class="text-bright-green">',
-        r'\x1b\[93m': '<span class="text-bright-yellow">',
-        r'\x1b\[94m': '<span class="text-bright-blue">',
-        r'\x1b\[95m': '<span class="text-bright-magenta">',
-        r'\x1b\[96m': '<span class="text-bright-cyan">',
-        r'\x1b\[97m': '<span class="text-bright-white">',
-
-        # Fallback patterns for literal "[ XXm" (with optional space)
-        # These are added to catch cases where \x1b is missing and a space is present.
-        # They should be processed *after* the \x1b patterns to prioritize correct ones.
-        r'\[\s*0m': '</span>',
-        r'\[\s*39m': '</span>',
-        r'\[\s*49m': '</span>',
-
-        r'\[\s*30m': '<span class="text-black">',
-        r'\[\s*31m': '<span class="text-red">',
-        r'\[\s*32m': '<span class="text-green">',
-        r'\[\s*33m': '<span class="text-yellow">',
-        r'\[\s*34m': '<span class="text-blue">',
-        r'\[\s*35m': '<span class="text-magenta">',
-        r'\[\s*36m': '<span class="text-cyan">',
-        r'\[\s*37m': '<span class="text-white">',
-
-        r'\[\s*90m': '<span class="text-gray">',
-        r'\[\s*91m': '<span class="text-bright-red">',
-        r'\[\s*92m': '<span class="text-bright-green">',
-        r'\[\s*93m': '<span class="text-bright-yellow">',
-        r'\[\s*94m': '<span class="text-bright-blue">',
-        r'\[\s*95m': '<span class="text-bright-magenta">',
-        r'\[\s*96m': '<span class="text-bright-cyan">',
-        r'\[\s*97m': '<span class="text-bright-white">',
-    }
-    
-    # Sort patterns by length in descending order to prevent partial matches
-    # (e.g., ensure r'\x1b[91m' is matched before r'\x1b[1m' if both were present and overlapping)
-    # This is good practice for regex replacement order.
-    sorted_patterns = sorted(ansi_patterns.items(), key=lambda item: len(item[0]), reverse=True)
-
-    for pattern, replacement in sorted_patterns:
-        text = re.sub(pattern, replacement, text)
+    # Every ANSI code contains a '[', so plain text (e.g. LLM output
+    # without colors) can skip the scan entirely
+    if '[' in text:
+        text = _replace_ansi_codes(text)
     
     # Convert newlines to HTML breaks for proper rendering in browser
     text = text.replace('\n', '<br>')
     
-    # Convert multiple spaces to non-breaking spaces for formatting
-    # This helps preserve the layout from terminal output in HTML.
-    # It replaces sequences of 2 or more spaces with equivalent &nbsp;
-    text = re.sub(r' {2,}', lambda m: '&nbsp;' * len(m.group()), text)
+    # Runs of spaces are left as is: .result-content in the template uses
+    # `white-space: pre-wrap`, so the browser preserves the terminal layout.
     
     return text
 
+# Separator used to format several response fields with a single
+# format_for_web call. Contains no '[' or newline, so it never takes part
+# in ANSI or line-break conversion.
+_FIELD_SEP = '\x00WWSEP\x00'
+
 def format_for_web(text):
     """
     Format the terminal output for web display.
-    This function first converts ANSI codes to HTML, then handles box drawing characters.
+    Box drawing characters are passed through as is, assuming the
+    browser's font support is adequate.
     """
     # Convert ANSI codes to HTML spans
-    html_text = convert_ansi_to_html(text)
-    
-    # Replace box drawing characters with HTML equivalents.
-    # These are usually rendered correctly by modern browsers, but explicit
-    # replacement can ensure consistency if font support is an issue.
-    # For now, keeping them as is, assuming font support is adequate.
-    replacements = {
-        '═': '═',
-        '─': '─', 
-        '┌': '┌',
-        '┐': '┐',
-        '└': '└',
-        '┘': '┘',
-        '│': '│',
-    }
-    
-    for old, new in replacements.items():
-        html_text = html_text.replace(old, new)
-    
-    return html_text
+    return convert_ansi_to_html(text)
+
+def json_response(payload):
+    """
+    Serialize the payload with orjson and wrap it in a JSON response.
+    orjson is considerably faster than the stdlib encoder on the large
+    HTML strings returned by /recommend.
+    """
+    return Response(orjson.dumps(payload), mimetype='application/json')
+
+def sse_event(event_type, **data):
+    """Encode a Server-Sent Event whose JSON data carries its type."""
+    return b"data: " + orjson.dumps({'type': event_type, **data}) + b"\n\n"
 
 @app.route('/')
 def index():
@@ -153,7 +174,7 @@ def get_recommendation():
         
         # Validate that a location query was provided
         if not location_query:
-            return jsonify({
+            return json_response({
                 'error': 'Please enter a location.',
                 'success': False
             })
@@ -161,21 +182,21 @@ def get_recommendation():
         # Validate and normalize the style preference
         style_preference = validate_style_preference(style_preference)
         
-        # Create an instance of OutfitGenerator and process the user's query
-        outfit_generator = OutfitGenerator()
+        # Reuse the shared OutfitGenerator and process the user's query
+        outfit_generator = get_generator()
         weather_info, outfit_recommendation, forecast_info = outfit_generator.process_query(
             query=location_query,
             style_preference=style_preference,
             show_forecast=show_forecast
         )
         
-        # Format the retrieved data for display in the web browser
-        weather_html = format_for_web(weather_info)
-        outfit_html = format_for_web(outfit_recommendation)
-        forecast_html = format_for_web(forecast_info) if forecast_info else ""
+        # Format the retrieved data for display in the web browser in one
+        # pass, joining the three fields with a separator no field contains
+        combined = _FIELD_SEP.join((weather_info, outfit_recommendation, forecast_info or ""))
+        weather_html, outfit_html, forecast_html = format_for_web(combined).split(_FIELD_SEP)
         
         # Return the formatted data as a JSON response
-        return jsonify({
+        return json_response({
             'success': True,
             'weather': weather_html,
             'outfit': outfit_html,
@@ -186,19 +207,67 @@ def get_recommendation():
         
     except ValueError as e:
         # Handle specific validation errors
-        return jsonify({
+        return json_response({
             'error': str(e),
             'success': False
         })
     except Exception as e:
         # Catch any other unexpected errors and provide a generic message
         # traceback.format_exc() can be used here for more detailed logging in debug mode
-        return jsonify({
+        return json_response({
             'error': f'An unexpected error occurred: {str(e)}',
             'success': False
         })
 
+@app.route('/recommend_stream')
+def stream_recommendation():
+    """
+    Stream the recommendation as Server-Sent Events.
+    The outfit text is sent as it is generated, followed by the formatted version.
+    """
+    # EventSource only issues GET requests, so the form data arrives as query parameters
+    location_query = request.args.get('location', '').strip()
+    style_preference = validate_style_preference(request.args.get('style', 'casual'))
+    show_forecast = request.args.get('forecast') == 'on'
+    
+    def generate():
+        # Validate that a location query was provided
+        if not location_query:
+            yield sse_event('error', error='Please enter a location.')
+            return
+        
+        try:
+            for event_type, text in get_generator().stream_query(
+                query=location_query,
+                style_preference=style_preference,
+                show_forecast=show_forecast
+            ):
+                if event_type == 'delta':
+                    # Raw LLM text, appended as plain text by the browser
+                    yield sse_event('delta', delta=text)
+                elif event_type == 'header':
+                    # The browser replaces the streamed text with the "outfit"
+                    # event, which includes the header
+                    continue
+                else:
+                    yield sse_event(event_type, html=format_for_web(text))
+            
+            yield sse_event('done', location=location_query, style=style_preference.title())
+            
+        except ValueError as e:
+            # Handle specific validation errors
+            yield sse_event('error', error=str(e))
+        except Exception as e:
+            # Catch any other unexpected errors and provide a generic message
+            yield sse_event('error', error=f'An unexpected error occurred: {str(e)}')
+    
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 if __name__ == '__main__':
+    # Initialize Colorama for proper ANSI code handling in the server's
+    # terminal output. Only needed when running the server directly.
+    init_colorama()
+    
     # Ensure the 'templates' directory exists for Flask to find HTML files
     templates_dir = Path(__file__).parent / 'templates'
     templates_dir.mkdir(exist_ok=True)
@@ -207,6 +276,7 @@ if __name__ == '__main__':
     print("📱 Open your browser and go to: http://localhost:5000")
     print("🛑 Press Ctrl+C to stop the server")
     
-    # Run the Flask application. debug=True enables reloader and debugger.
-    app.run(debug=True, host='localhost', port=5000)
+    # Serve the Flask application with waitress. Its thread pool handles
+    # concurrent requests, so one user's slow LLM call doesn't block others.
+    serve(app, host='localhost', port=5000, threads=8)
 
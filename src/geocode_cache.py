@@ -0,0 +1,112 @@
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+from .utils import load_env_variable
+
+# Runs of whitespace collapsed when normalizing location names
+_WHITESPACE_RE = re.compile(r'\s+')
+
+class GeocodeCache:
+    """
+    Disk-backed cache of location name -> (lat, lon) and the place name and
+    country the API resolved it to, so names that were resolved before can
+    be looked up by coordinates instead of by name.
+    The whole cache is small enough to keep in memory; it is loaded once
+    and written back when the process exits.
+    """
+    
+    def __init__(self, path: str = None, max_age: float = 30 * 86400):
+        """
+        Load the cache file, dropping expired entries.
+        
+        Args:
+            path: JSON file, defaults to GEOCODE_CACHE_PATH or ~/.cache/weatherwear/geocode.json
+            max_age: Seconds an entry stays valid
+        """
+        path = path or load_env_variable("GEOCODE_CACHE_PATH", "~/.cache/weatherwear/geocode.json")
+        self.path = Path(os.path.expanduser(path))
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = self._load()
+        atexit.register(self.save)
+    
+    @staticmethod
+    def normalize(location: str) -> str:
+        """Normalize a location name for use as a cache key."""
+        return _WHITESPACE_RE.sub(" ", location.strip().lower())
+    
+    def _load(self) -> dict:
+        """Read unexpired entries from disk. A missing or unreadable file gives an empty cache."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        
+        # Skip malformed entries, so a bad file can't break every lookup
+        oldest = time.time() - self.max_age
+        return {
+            key: entry for key, entry in entries.items()
+            if self._is_valid(entry) and entry["ts"] > oldest
+        }
+    
+    @staticmethod
+    def _is_valid(entry: Any) -> bool:
+        """Check that an entry loaded from disk has the shape written by set()."""
+        return (
+            isinstance(entry, dict)
+            and isinstance(entry.get("ts"), (int, float))
+            and isinstance(entry.get("coords"), list)
+            and len(entry["coords"]) == 2
+            and isinstance(entry.get("name", ""), str)
+        )
+    
+    def get(self, location: str) -> Optional[Tuple[float, float]]:
+        """Return the cached (lat, lon) for a location, or None if unknown or expired."""
+        entry = self._entries.get(self.normalize(location))
+        if entry is None or entry["ts"] <= time.time() - self.max_age:
+            return None
+        lat, lon = entry["coords"]
+        return lat, lon
+    
+    def get_place(self, location: str) -> Optional[Tuple[str, str]]:
+        """Return the cached (name, country) a location resolved to, or None if unknown or expired."""
+        entry = self._entries.get(self.normalize(location))
+        if entry is None or entry["ts"] <= time.time() - self.max_age or "name" not in entry:
+            return None
+        return entry["name"], entry.get("country", "")
+    
+    def set(self, location: str, lat: float, lon: float, name: str = None, country: str = "") -> None:
+        """Remember the coordinates of a location, and the place name and country if known."""
+        entry = {"coords": [lat, lon], "ts": time.time()}
+        if name:
+            entry["name"] = name
+            entry["country"] = country or ""
+        with self._lock:
+            self._entries[self.normalize(location)] = entry
+            self._dirty = True
+    
+    def save(self) -> None:
+        """Write the cache to disk if it changed. Failures are ignored since caching is best-effort."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._entries)
+            self._dirty = False
+        
+        # Write to a temporary file first so a crash never leaves a truncated cache
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(data, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
@@ -1,84 +1,185 @@
-import os
-from typing import Dict, Any, Optional
-import groq
-from .utils import load_env_variable
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Any, Iterator, Optional
+from groq import Groq
+from .utils import load_env_variable, _round_number
+from .llm_cache import LLMCache
+
+# Lower temperature bounds (°C) separating the _TEMP_BUCKETS entries
+_TEMP_BOUNDS = (15, 20, 25, 30)
+
+# (temp_category, top_layer, mid_layer, bottoms, shoes) for each temperature range
+_TEMP_BUCKETS = (
+    ("cold", "Warm coat or heavy jacket", "Thick sweater or hoodie",
+     "Warm pants with thermal layer", "Insulated boots or warm shoes"),
+    ("cool", "Warm sweater or fleece", "Light jacket or blazer",
+     "Warm pants or dark jeans", "Closed-toe shoes or ankle boots"),
+    ("mild", "Long-sleeve shirt or light sweater", "Denim jacket or light hoodie",
+     "Jeans or comfortable trousers", "Sneakers or casual boots"),
+    ("warm", "Cotton t-shirt or light blouse", "Light cardigan or kimono (optional)",
+     "Comfortable chinos or light jeans", "Canvas sneakers or loafers"),
+    ("hot", "Light cotton shirt or breathable tank top", "Skip the mid-layer - keep it minimal",
+     "Lightweight shorts or linen pants", "Breathable sneakers or sandals"),
+)
+
+_FORMAL_WARM = {
+    "top_layer": "Lightweight dress shirt or silk blouse",
+    "bottoms": "Dress pants or midi skirt",
+    "shoes": "Leather loafers or heeled sandals",
+}
+_FORMAL_COOL = {
+    "top_layer": "Button-down shirt or tailored blouse",
+    "mid_layer": "Blazer or structured cardigan",
+    "bottoms": "Dress pants or pencil skirt",
+    "shoes": "Oxford shoes or low heels",
+}
+_SPORTY_WARM = {
+    "top_layer": "Moisture-wicking athletic top",
+    "bottoms": "Athletic shorts or leggings",
+    "shoes": "Running shoes or training sneakers",
+}
+_SPORTY_COOL = {
+    "top_layer": "Athletic long-sleeve or hoodie",
+    "bottoms": "Track pants or athletic leggings",
+    "shoes": "Cross-training shoes or athletic sneakers",
+}
+
+# Clothing overrides keyed by (style_preference, temp_category)
+_STYLE_OVERRIDES = {
+    ("formal", "hot"): _FORMAL_WARM,
+    ("formal", "warm"): _FORMAL_WARM,
+    ("formal", "mild"): _FORMAL_COOL,
+    ("formal", "cool"): _FORMAL_COOL,
+    ("formal", "cold"): _FORMAL_COOL,
+    ("sporty", "hot"): _SPORTY_WARM,
+    ("sporty", "warm"): _SPORTY_WARM,
+    ("sporty", "mild"): _SPORTY_COOL,
+    ("sporty", "cool"): _SPORTY_COOL,
+    ("sporty", "cold"): _SPORTY_COOL,
+}
+
+# (keyword, accessories, weather_adjustments) checked in order against the conditions
+_PRECIPITATION_ADJUSTMENTS = (
+    ("rain", ("Waterproof jacket or umbrella", "Water-resistant shoes"),
+     "The rain calls for waterproof layers and quick-dry materials."),
+    ("snow", ("Warm hat and gloves", "Waterproof boots"),
+     "Snow means insulation is key - layer up and stay dry."),
+)
+
+_HAZE_KEYWORDS = ("haze", "fog")
+
+_DEFAULT_ACCESSORIES = ("Sunglasses for UV protection", "Light scarf (versatile for style or warmth)")
+
+# Location-specific styling suggestions keyed by lowercase city name
+_LOCATION_TIPS = {
+    "mumbai": "Mumbai's coastal humidity calls for cotton and linen - avoid synthetic fabrics!",
+    "delhi": "Delhi's dry climate is perfect for layering - add a light jacket for evening temperature drops.",
+    "bangalore": "Bangalore's pleasant weather is ideal for smart-casual looks with light layers.",
+    "chennai": "Chennai's heat and humidity require maximum breathability - cotton is king!",
+    "kolkata": "Kolkata's cultural vibe pairs well with comfortable yet stylish ethnic-western fusion.",
+    "hyderabad": "Hyderabad's moderate climate allows for versatile styling - perfect for experimenting!",
+    "pune": "Pune's weather is ideal for outdoor activities - dress comfortably for movement.",
+    "nagpur": "Nagpur's central location means variable weather - layering is your best strategy!"
+}
+
+# Playlist names keyed by temperature category
+_PLAYLIST_NAMES = {
+    "hot": "Tropical Chill Vibes",
+    "warm": "Sunny Day Grooves", 
+    "mild": "Perfect Weather Playlist",
+    "cool": "Cozy Comfort Tunes",
+    "cold": "Winter Warmth Beats"
+}
+
+@lru_cache(maxsize=256, typed=True)
+def _build_fallback_recommendation(
+    temp: float,
+    feels_like: float,
+    humidity: float,
+    wind_speed: float,
+    conditions: str,
+    weather_location: str,
+    style_preference: str,
+    has_error: bool
+) -> str:
+    """Build the fallback recommendation text for the given weather values."""
+    # Determine clothing based on temperature
+    temp_category, top_layer, mid_layer, bottoms, shoes = _TEMP_BUCKETS[bisect_right(_TEMP_BOUNDS, temp)]
+        
+    # Lowercase once for all the style and condition checks below
+    style_lc = style_preference.lower()
+    cond_lc = conditions.lower()
+    
+    # Adjust for style preference
+    overrides = _STYLE_OVERRIDES.get((style_lc, temp_category), {})
+    top_layer = overrides.get("top_layer", top_layer)
+    mid_layer = overrides.get("mid_layer", mid_layer)
+    bottoms = overrides.get("bottoms", bottoms)
+    shoes = overrides.get("shoes", shoes)
+            
+    # Weather-specific adjustments
+    accessories = ()
+    precipitation = next((entry for entry in _PRECIPITATION_ADJUSTMENTS if entry[0] in cond_lc), None)
+    
+    if precipitation:
+        _, accessories, weather_adjustments = precipitation
+    elif wind_speed > 15:
+        accessories = ("Windbreaker or scarf",)
+        weather_adjustments = f"With {wind_speed} km/h winds, wind-resistant layers will keep you comfortable."
+    elif humidity > 70:
+        weather_adjustments = f"High humidity ({humidity}%) means breathable, moisture-wicking fabrics are your friend."
+    elif any(keyword in cond_lc for keyword in _HAZE_KEYWORDS):
+        weather_adjustments = "Hazy conditions mean the air might feel thick - opt for breathable layers."
+    else:
+        weather_adjustments = f"Perfect {conditions} weather - dress comfortably for the temperature."
+        
+    if not accessories:
+        accessories = _DEFAULT_ACCESSORIES
+        
+    # Location-specific suggestions
+    location_tip = _LOCATION_TIPS.get(weather_location.lower(), f"Local {weather_location} style embraces comfort with a touch of regional flair!")
+    
+    # Create playlist based on weather and location
+    playlist = _PLAYLIST_NAMES.get(temp_category, "Weather Perfect Playlist")
+    
+    return f"""🎽 Your Look, Tailored to {conditions.title()} & {weather_location} Vibes
+{weather_adjustments} At {temp}°C (feels like {feels_like}°C), comfort meets style effortlessly.
+
+🧢 Top Layer: {top_layer}
+👕 Mid-Layer: {mid_layer}
+👖 Bottoms: {bottoms}
+👟 Shoes: {shoes}
+🧤 Accessories: {' and '.join(accessories)}
+
+🧠 Smart Layering Tip:
+With {temp}°C weather and {humidity}% humidity, focus on breathable materials that can adapt as temperatures change throughout the day. {'' if temp >= 25 else 'Light layers you can add or remove are key for comfort.'}
+
+🌍 Local Flavor Add-On:
+{location_tip}
+
+🎒 Your Pack & Prep List:
+🧴 {'Sunscreen SPF 30+' if temp >= 25 else 'Light moisturizer'}
+🔋 Portable phone charger
+🧦 {'Moisture-wicking socks' if temp >= 25 else 'Comfortable cotton socks'}
+🧃 {'Insulated water bottle - stay hydrated!' if temp >= 25 else 'Warm drink in a thermos'}
+🧼 {'Cooling face wipes' if temp >= 25 else 'Hand sanitizer and tissues'}
+{'🌂 Compact umbrella' if 'rain' in cond_lc else '🕶️ Sunglasses for eye protection'}
+
+🎵 {playlist} 🎧
+
+💬 Confidence Closer:
+Perfect weather calls for perfect style! You're dressed to embrace {weather_location}'s {temp}°C {conditions} with confidence and comfort. Whether you're exploring the city or enjoying a casual day out, your look says effortless sophistication.
+🗣️ "Weather-ready and style-perfect - bring on the day!"
+
+{f"Have a Great Day!" if has_error else ""}"""
 
 class LLMClient:
     """
     Handles interactions with the Groq LLM API.
     """
     
-    def __init__(self):
-        """Initialize the LLM client with API key from environment variables."""
-        self.api_key = load_env_variable("GROQ_API_KEY")
-        self.model = load_env_variable("GROQ_MODEL", "llama-3.1-70b-versatile")
-        
-        # Set environment variable first
-        os.environ["GROQ_API_KEY"] = self.api_key
-        
-        # Try different initialization methods with more specific error handling
-        self.client = None
-        
-        # Method 1: Try with explicit API key (most common)
-        try:
-            self.client = groq.Groq(api_key=self.api_key)
-            print("Groq client initialized successfully with API key")
-        except Exception as e:
-            print(f"Method 1 failed: {e}")
-            
-            # Method 2: Try without explicit API key (uses environment)
-            try:
-                self.client = groq.Groq()
-                print("Groq client initialized successfully from environment")
-            except Exception as e2:
-                print(f"Method 2 failed: {e2}")
-                
-                # Method 3: Try importing differently
-                try:
-                    from groq import Groq
-                    self.client = Groq(api_key=self.api_key)
-                    print("Groq client initialized with direct import")
-                except Exception as e3:
-                    print(f"Method 3 failed: {e3}")
-                    
-                    # Method 4: Last resort - create a mock client for testing
-                    print("All Groq initialization methods failed. Using fallback mode.")
-                    self.client = None
-        
-    def generate_outfit_recommendation(
-        self, 
-        weather_data: Dict[str, Any], 
-        location: str, 
-        style_preference: str,
-        is_future: bool
-    ) -> str:
-        """
-        Generate outfit recommendations based on weather data.
-        
-        Args:
-            weather_data: Weather data from OpenWeatherMap API
-            location: Location name
-            style_preference: User's style preference (casual, formal, sporty)
-            is_future: Whether the weather data is for future or current
-            
-        Returns:
-            Outfit recommendation text
-        """
-        # Extract relevant weather information
-        try:
-            temp = weather_data.get("main", {}).get("temp", "unknown")
-            feels_like = weather_data.get("main", {}).get("feels_like", "unknown")
-            humidity = weather_data.get("main", {}).get("humidity", "unknown")
-            wind_speed = weather_data.get("wind", {}).get("speed", "unknown")
-            conditions = weather_data.get("weather", [{}])[0].get("description", "unknown") if weather_data.get("weather") else "unknown"
-            weather_location = weather_data.get("name", location)
-            country = weather_data.get("sys", {}).get("country", "")
-            
-            # Format time context
-            time_context = "current" if not is_future else "forecasted"
-            
-            # Create enhanced prompt for detailed recommendations
-            prompt = f"""
+    # Enhanced prompt template for detailed recommendations, filled in with str.format
+    _PROMPT_TPL = """
             You are WeatherWear, an expert fashion stylist who creates detailed, creative, and personalized outfit recommendations. 
             Create a comprehensive outfit recommendation for {weather_location}, {country} with the following weather:
             - Temperature: {temp}°C (feels like {feels_like}°C)
@@ -116,6 +217,50 @@ class LLMClient:
             
             Make it creative, detailed, and weather-appropriate for {style_preference} style. Use vivid descriptions and practical advice.
             """
+    
+    def __init__(self):
+        """Initialize the LLM client with API key from environment variables."""
+        self.api_key = load_env_variable("GROQ_API_KEY")
+        self.model = load_env_variable("GROQ_MODEL", "llama-3.1-70b-versatile")
+        
+        # Responses are cached on disk so repeated prompts skip the API call
+        self.cache = LLMCache()
+        
+        # Fall back to the built-in recommendation if the client can't be created
+        self.client = None
+        try:
+            self.client = Groq(api_key=self.api_key)
+            print("Groq client initialized successfully with API key")
+        except Exception as e:
+            print(f"Groq client initialization failed: {e}. Using fallback mode.")
+        
+    def generate_outfit_recommendation(
+        self, 
+        weather_data: Dict[str, Any], 
+        location: str, 
+        style_preference: str,
+        is_future: bool
+    ) -> str:
+        """
+        Generate outfit recommendations based on weather data.
+        
+        Args:
+            weather_data: Weather data from OpenWeatherMap API
+            location: Location name
+            style_preference: User's style preference (casual, formal, sporty)
+            is_future: Whether the weather data is for future or current
+            
+        Returns:
+            Outfit recommendation text
+        """
+        try:
+            prompt = self._build_prompt(weather_data, location, style_preference, is_future)
+            
+            # Return a cached response for the same prompt if there is one
+            cache_key = LLMCache.make_key(self.model, 0.8, prompt)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
             
             # Generate recommendation using Groq API
             if self.client is not None:
@@ -133,8 +278,9 @@ class LLMClient:
                 )
                 
                 # Extract the generated text
-                recommendation = chat_completion.choices[0].message.content
-                return recommendation.strip()
+                recommendation = chat_completion.choices[0].message.content.strip()
+                self.cache.set(cache_key, recommendation)
+                return recommendation
             else:
                 # Use fallback if client initialization failed
                 return self._create_fallback_recommendation(weather_data, location, style_preference, "Groq client not available")
@@ -143,144 +289,112 @@ class LLMClient:
             # Fallback recommendation if there's an error
             return self._create_fallback_recommendation(weather_data, location, style_preference, str(e))
     
-    def _create_fallback_recommendation(self, weather_data: Dict[str, Any], location: str, style_preference: str, error: str = "") -> str:
-        """Create a detailed, weather-specific fallback recommendation if LLM fails."""
-        temp = weather_data.get("main", {}).get("temp", 20)
-        feels_like = weather_data.get("main", {}).get("feels_like", temp)
-        humidity = weather_data.get("main", {}).get("humidity", 50)
-        wind_speed = weather_data.get("wind", {}).get("speed", 0)
-        conditions = weather_data.get("weather", [{}])[0].get("description", "clear") if weather_data.get("weather") else "clear"
+    def _build_prompt(self, weather_data: Dict[str, Any], location: str, style_preference: str, is_future: bool) -> str:
+        """Fill the prompt template with weather information for the LLM."""
+        # Extract relevant weather information
+        main = weather_data.get("main") or {}
+        wind = weather_data.get("wind") or {}
+        sys_ = weather_data.get("sys") or {}
+        weather_list = weather_data.get("weather") or [{}]
+        
+        temp = main.get("temp", "unknown")
+        feels_like = main.get("feels_like", "unknown")
+        humidity = main.get("humidity", "unknown")
+        wind_speed = wind.get("speed", "unknown")
+        conditions = weather_list[0].get("description", "unknown")
         weather_location = weather_data.get("name", location)
-        country = weather_data.get("sys", {}).get("country", "")
+        country = sys_.get("country", "")
         
-        # Determine clothing based on temperature
-        if temp >= 30:
-            temp_category = "hot"
-            top_layer = "Light cotton shirt or breathable tank top"
-            mid_layer = "Skip the mid-layer - keep it minimal"
-            bottoms = "Lightweight shorts or linen pants"
-            shoes = "Breathable sneakers or sandals"
-        elif temp >= 25:
-            temp_category = "warm"
-            top_layer = "Cotton t-shirt or light blouse"
-            mid_layer = "Light cardigan or kimono (optional)"
-            bottoms = "Comfortable chinos or light jeans"
-            shoes = "Canvas sneakers or loafers"
-        elif temp >= 20:
-            temp_category = "mild"
-            top_layer = "Long-sleeve shirt or light sweater"
-            mid_layer = "Denim jacket or light hoodie"
-            bottoms = "Jeans or comfortable trousers"
-            shoes = "Sneakers or casual boots"
-        elif temp >= 15:
-            temp_category = "cool"
-            top_layer = "Warm sweater or fleece"
-            mid_layer = "Light jacket or blazer"
-            bottoms = "Warm pants or dark jeans"
-            shoes = "Closed-toe shoes or ankle boots"
-        else:
-            temp_category = "cold"
-            top_layer = "Warm coat or heavy jacket"
-            mid_layer = "Thick sweater or hoodie"
-            bottoms = "Warm pants with thermal layer"
-            shoes = "Insulated boots or warm shoes"
-            
-        # Adjust for style preference
-        if style_preference.lower() == "formal":
-            if temp >= 25:
-                top_layer = "Lightweight dress shirt or silk blouse"
-                bottoms = "Dress pants or midi skirt"
-                shoes = "Leather loafers or heeled sandals"
-            else:
-                top_layer = "Button-down shirt or tailored blouse"
-                mid_layer = "Blazer or structured cardigan"
-                bottoms = "Dress pants or pencil skirt"
-                shoes = "Oxford shoes or low heels"
-        elif style_preference.lower() == "sporty":
-            if temp >= 25:
-                top_layer = "Moisture-wicking athletic top"
-                bottoms = "Athletic shorts or leggings"
-                shoes = "Running shoes or training sneakers"
-            else:
-                top_layer = "Athletic long-sleeve or hoodie"
-                bottoms = "Track pants or athletic leggings"
-                shoes = "Cross-training shoes or athletic sneakers"
-                
-        # Weather-specific adjustments
-        accessories = []
-        weather_adjustments = ""
+        # Format time context
+        time_context = "current" if not is_future else "forecasted"
         
-        if "rain" in conditions.lower():
-            accessories.extend(["Waterproof jacket or umbrella", "Water-resistant shoes"])
-            weather_adjustments = "The rain calls for waterproof layers and quick-dry materials."
-        elif "snow" in conditions.lower():
-            accessories.extend(["Warm hat and gloves", "Waterproof boots"])
-            weather_adjustments = "Snow means insulation is key - layer up and stay dry."
-        elif wind_speed > 15:
-            accessories.append("Windbreaker or scarf")
-            weather_adjustments = f"With {wind_speed} km/h winds, wind-resistant layers will keep you comfortable."
-        elif humidity > 70:
-            weather_adjustments = f"High humidity ({humidity}%) means breathable, moisture-wicking fabrics are your friend."
-        elif "haze" in conditions.lower() or "fog" in conditions.lower():
-            weather_adjustments = "Hazy conditions mean the air might feel thick - opt for breathable layers."
-        else:
-            weather_adjustments = f"Perfect {conditions} weather - dress comfortably for the temperature."
-            
-        if not accessories:
-            accessories = ["Sunglasses for UV protection", "Light scarf (versatile for style or warmth)"]
+        # Create enhanced prompt for detailed recommendations. Readings are
+        # rounded so small changes between refreshes give the same cached response.
+        return self._PROMPT_TPL.format(
+            weather_location=weather_location,
+            country=country,
+            temp=_round_number(temp),
+            feels_like=_round_number(feels_like),
+            humidity=humidity,
+            wind_speed=_round_number(wind_speed),
+            conditions=conditions,
+            style_preference=style_preference,
+            time_context=time_context
+        )
+
+    def stream_outfit_recommendation(
+        self, 
+        weather_data: Dict[str, Any], 
+        location: str, 
+        style_preference: str,
+        is_future: bool
+    ) -> Iterator[str]:
+        """
+        Stream outfit recommendations as they are generated.
+        
+        Args:
+            weather_data: Weather data from OpenWeatherMap API
+            location: Location name
+            style_preference: User's style preference (casual, formal, sporty)
+            is_future: Whether the weather data is for future or current
             
-        # Location-specific suggestions
-        location_tips = {
-            "mumbai": "Mumbai's coastal humidity calls for cotton and linen - avoid synthetic fabrics!",
-            "delhi": "Delhi's dry climate is perfect for layering - add a light jacket for evening temperature drops.",
-            "bangalore": "Bangalore's pleasant weather is ideal for smart-casual looks with light layers.",
-            "chennai": "Chennai's heat and humidity require maximum breathability - cotton is king!",
-            "kolkata": "Kolkata's cultural vibe pairs well with comfortable yet stylish ethnic-western fusion.",
-            "hyderabad": "Hyderabad's moderate climate allows for versatile styling - perfect for experimenting!",
-            "pune": "Pune's weather is ideal for outdoor activities - dress comfortably for movement.",
-            "nagpur": "Nagpur's central location means variable weather - layering is your best strategy!"
-        }
+        Yields:
+            Chunks of outfit recommendation text. Errors raised by the Groq API
+            are propagated so callers can discard the partial text.
+        """
+        if self.client is None:
+            # Use fallback if client initialization failed
+            yield self._create_fallback_recommendation(weather_data, location, style_preference, "Groq client not available")
+            return
         
-        location_tip = location_tips.get(weather_location.lower(), f"Local {weather_location} style embraces comfort with a touch of regional flair!")
+        prompt = self._build_prompt(weather_data, location, style_preference, is_future)
         
-        # Create playlist based on weather and location
-        playlist_names = {
-            "hot": "Tropical Chill Vibes",
-            "warm": "Sunny Day Grooves", 
-            "mild": "Perfect Weather Playlist",
-            "cool": "Cozy Comfort Tunes",
-            "cold": "Winter Warmth Beats"
-        }
+        # A cached response is sent as a single chunk
+        cache_key = LLMCache.make_key(self.model, 0.8, prompt)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
         
-        playlist = playlist_names.get(temp_category, "Weather Perfect Playlist")
+        stream = self.client.chat.completions.create(
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            model=self.model,
+            temperature=0.8,
+            max_tokens=800,
+            top_p=0.9,
+            stream=True
+        )
         
-        return f"""🎽 Your Look, Tailored to {conditions.title()} & {weather_location} Vibes
-{weather_adjustments} At {temp}°C (feels like {feels_like}°C), comfort meets style effortlessly.
-
-🧢 Top Layer: {top_layer}
-👕 Mid-Layer: {mid_layer}
-👖 Bottoms: {bottoms}
-👟 Shoes: {shoes}
-🧤 Accessories: {' and '.join(accessories)}
-
-🧠 Smart Layering Tip:
-With {temp}°C weather and {humidity}% humidity, focus on breathable materials that can adapt as temperatures change throughout the day. {'' if temp >= 25 else 'Light layers you can add or remove are key for comfort.'}
-
-🌍 Local Flavor Add-On:
-{location_tip}
-
-🎒 Your Pack & Prep List:
-🧴 {'Sunscreen SPF 30+' if temp >= 25 else 'Light moisturizer'}
-🔋 Portable phone charger
-🧦 {'Moisture-wicking socks' if temp >= 25 else 'Comfortable cotton socks'}
-🧃 {'Insulated water bottle - stay hydrated!' if temp >= 25 else 'Warm drink in a thermos'}
-🧼 {'Cooling face wipes' if temp >= 25 else 'Hand sanitizer and tissues'}
-{'🌂 Compact umbrella' if 'rain' in conditions.lower() else '🕶️ Sunglasses for eye protection'}
-
-🎵 {playlist} 🎧
-
-💬 Confidence Closer:
-Perfect weather calls for perfect style! You're dressed to embrace {weather_location}'s {temp}°C {conditions} with confidence and comfort. Whether you're exploring the city or enjoying a casual day out, your look says effortless sophistication.
-🗣️ "Weather-ready and style-perfect - bring on the day!"
-
-{f"Have a Great Day!" if error else ""}"""
\ No newline at end of file
+        chunks = []
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                chunks.append(delta)
+                yield delta
+        
+        self.cache.set(cache_key, "".join(chunks).strip())
+    
+    def _create_fallback_recommendation(self, weather_data: Dict[str, Any], location: str, style_preference: str, error: str = "") -> str:
+        """Create a detailed, weather-specific fallback recommendation if LLM fails."""
+        main = weather_data.get("main") or {}
+        wind = weather_data.get("wind") or {}
+        weather_list = weather_data.get("weather") or [{}]
+        
+        temp = main.get("temp", 20)
+        feels_like = main.get("feels_like", temp)
+        humidity = main.get("humidity", 50)
+        wind_speed = wind.get("speed", 0)
+        conditions = weather_list[0].get("description", "clear")
+        weather_location = weather_data.get("name", location)
+        
+        # The fallback is a pure function of these values, so repeated
+        # queries for the same weather are served from the cache
+        return _build_fallback_recommendation(
+            temp, feels_like, humidity, wind_speed, conditions,
+            weather_location, style_preference, bool(error)
+        )
\ No newline at end of file
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from .utils import load_env_variable
+
+class LLMCache:
+    """
+    Disk-backed cache of LLM responses, keyed by a hash of the model, sampling
+    temperature and prompt so repeated queries skip the LLM round-trip.
+    """
+    
+    def __init__(self, path: str = None, ttl: float = 86400):
+        """
+        Open (or create) the SQLite cache database.
+        
+        Args:
+            path: Database file, defaults to LLM_CACHE_PATH or ~/.cache/weatherwear/llm.sqlite3
+            ttl: Seconds a cached response stays valid
+        """
+        path = path or load_env_variable("LLM_CACHE_PATH", "~/.cache/weatherwear/llm.sqlite3")
+        self.path = Path(os.path.expanduser(path))
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        
+        # Caching is best-effort: without a usable database every lookup misses
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+        except (OSError, sqlite3.Error) as e:
+            print(f"LLM cache unavailable: {e}")
+            self._conn = None
+            
+    @staticmethod
+    def make_key(model: str, temperature: float, prompt: str) -> str:
+        """Build the cache key for a completion request."""
+        return hashlib.blake2b(f"{model}|{temperature}|{prompt}".encode("utf-8"), digest_size=16).hexdigest()
+        
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None if missing, expired or unreadable."""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+        
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response under key, dropping expired responses so the database
+        doesn't grow without bound. Failures are ignored since caching is best-effort.
+        """
+        if self._conn is None:
+            return
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, now + self.ttl)
+                )
+        except sqlite3.Error:
+            pass
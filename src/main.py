@@ -4,25 +4,21 @@ WeatherWear: Weather-Based Outfit Recommender
 Main entry point for the application.
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
-from colorama import Fore, Style, init
+from colorama import Fore, Style
 import traceback
 
-# Load environment variables from .env file
-load_dotenv()
-
 # Add project root to path to ensure imports work
-project_root = Path(__file__).resolve().parent.parent
-sys.path.insert(0, str(project_root))
-
-# Initialize colorama for cross-platform colored terminal output
-init(autoreset=True)
+project_root = str(Path(__file__).resolve().parent.parent)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from src.outfit_generator import OutfitGenerator
-from src.utils import validate_style_preference
+from src.utils import validate_style_preference, init_colorama
 
 def print_welcome():
     """Display welcome message."""
@@ -56,8 +52,63 @@ def get_user_input() -> tuple:
     
     return location_query, style_preference, show_forecast
 
-def main():
-    """Main entry point for WeatherWear application."""
+def parse_args() -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="WeatherWear: Weather-Based Outfit Recommender")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="print the outfit recommendation as it is generated"
+    )
+    return parser.parse_args()
+
+def print_streamed_results(outfit_generator: OutfitGenerator, location_query: str, style_preference: str, show_forecast: bool):
+    """Print results as they arrive, styling each recommendation line once it is complete."""
+    header = ""
+    streamed = ""
+    pending = ""
+    for event_type, text in outfit_generator.stream_query(
+        query=location_query,
+        style_preference=style_preference,
+        show_forecast=show_forecast
+    ):
+        if event_type == "weather":
+            print("\n" + text + "\n")
+        elif event_type == "header":
+            header = text
+            print(header)
+        elif event_type == "delta":
+            streamed += text
+            pending += text
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                styled = outfit_generator._add_proper_spacing_to_recommendation(line)
+                if styled:
+                    print(styled)
+        elif event_type == "outfit":
+            # The formatted recommendation repeats the header and, unless the
+            # streamed text was replaced by a retry or fallback, the streamed body
+            last_line = outfit_generator._add_proper_spacing_to_recommendation(pending)
+            if last_line:
+                print(last_line)
+            
+            styled_body = outfit_generator._add_proper_spacing_to_recommendation(streamed)
+            rest = text[len(header):] if text.startswith(header) else text
+            if styled_body and styled_body in rest:
+                rest = rest[rest.index(styled_body) + len(styled_body):]
+            elif streamed.strip():
+                print(f"\n{Fore.YELLOW}The recommendation above was replaced:{Style.RESET_ALL}")
+            print(rest.removeprefix("\n"))
+        elif text:
+            print(text)
+
+def main(stream: bool = False):
+    """
+    Main entry point for WeatherWear application.
+    
+    Args:
+        stream: Print the outfit recommendation as it is generated
+    """
     print_welcome()
     print_instructions()
     
@@ -70,6 +121,10 @@ def main():
         # Create outfit generator
         outfit_generator = OutfitGenerator()
         
+        if stream:
+            print_streamed_results(outfit_generator, location_query, style_preference, show_forecast)
+            return
+        
         # Process query and get recommendation
         weather_info, outfit_recommendation, forecast_info = outfit_generator.process_query(
             query=location_query,
@@ -89,8 +144,14 @@ def main():
         print(f"\n{Fore.RED}Error: {str(e)}{Style.RESET_ALL}")
     except Exception as e:
         print(f"\n{Fore.RED}An unexpected error occurred: {str(e)}{Style.RESET_ALL}")
-    traceback.print_exc()
+        traceback.print_exc()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Load environment variables from .env file
+    load_dotenv()
+    
+    # Initialize colorama for cross-platform colored terminal output
+    init_colorama()
+    
+    main(stream=parse_args().stream)
\ No newline at end of file
@@ -1,8 +1,176 @@
-from typing import Dict, Any, Optional, Tuple, List
+import asyncio
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, Iterator, Optional, Tuple, List
 from .weather_api import WeatherAPI
 from .llm_api import LLMClient
+from .llm_cache import LLMCache
 from .utils import parse_time_from_query, extract_location, colorize_weather, format_outfit_recommendation, get_current_location, format_forecast_display
-from colorama import Fore, Style
+from .utils import _BLUE, _CYAN, _GREEN, _MAGENTA, _WHITE, _YELLOW, _RESET, _round_number
+
+# Sophisticated mood tags based on conditions and style
+_MOOD_TAGS = MappingProxyType({
+    ("casual", "clear"): "Effortless Sunshine Vibes",
+    ("casual", "clouds"): "Cozy Urban Explorer", 
+    ("casual", "rain"): "Chic Storm Chaser",
+    ("casual", "snow"): "Winter Wonderland Wanderer",
+    ("formal", "clear"): "Polished Perfection",
+    ("formal", "clouds"): "Sophisticated City Dweller",
+    ("formal", "rain"): "Executive Weather Warrior", 
+    ("formal", "snow"): "Elegant Winter Professional",
+    ("sporty", "clear"): "Athletic Sunshine Ready",
+    ("sporty", "clouds"): "Urban Athlete Meets Cool Breeze",
+    ("sporty", "rain"): "Storm-Proof Fitness Champion",
+    ("sporty", "snow"): "Winter Sports Enthusiast"
+})
+
+# Weather condition descriptions keyed by lowercase OpenWeatherMap description
+_WEATHER_DESCRIPTIONS = MappingProxyType({
+    "clear": "Bright & Beautiful",
+    "clear sky": "Bright & Beautiful",
+    "few clouds": "Partly Cloudy & Pleasant", 
+    "scattered clouds": "Cloudy with Character",
+    "broken clouds": "Dramatically Overcast",
+    "overcast clouds": "Moody & Atmospheric",
+    "light rain": "Gentle Drizzle",
+    "moderate rain": "Refreshing Rainfall", 
+    "heavy rain": "Intense Downpour",
+    "light snow": "Delicate Snowfall",
+    "snow": "Winter Wonderland",
+    "mist": "Mysterious & Misty",
+    "fog": "Dreamy & Ethereal"
+})
+
+# Recommendation line styles keyed by the first code point of the leading emoji.
+# Each entry is (full emoji, text before the line, color, text after the line).
+_LINE_STYLES = {
+    '🎽': ('🎽', '\n', _YELLOW, '\n'),
+    '🧢': ('🧢', '', _WHITE, ''),
+    '👕': ('👕', '', _WHITE, ''),
+    '👖': ('👖', '', _WHITE, ''),
+    '👟': ('👟', '', _WHITE, ''),
+    '🧤': ('🧤', '', _WHITE, ''),
+    '🧠': ('🧠', '\n', _CYAN, ''),
+    '🌍': ('🌍', '\n', _GREEN, ''),
+    '🎒': ('🎒', '\n', _BLUE, ''),
+    '🎵': ('🎵', '\n', _MAGENTA, ''),
+    '💬': ('💬', '\n', _YELLOW, ''),
+    '🗣': ('🗣️', '', _GREEN, ''),
+    '🧴': ('🧴', '  ', _WHITE, ''),
+    '🔋': ('🔋', '  ', _WHITE, ''),
+    '🧦': ('🧦', '  ', _WHITE, ''),
+    '🧃': ('🧃', '  ', _WHITE, ''),
+    '🧼': ('🧼', '  ', _WHITE, ''),
+    '🌂': ('🌂', '  ', _WHITE, ''),
+    '🕶': ('🕶️', '  ', _WHITE, ''),
+}
+
+# Ultra-creative prompt used when the regular recommendation misses the expected format
+_CREATIVE_PROMPT_TMPL = """
+            You are WeatherWear, the world's most creative and diverse fashion stylist who creates stunning, unique outfit recommendations. 
+            Create an absolutely captivating outfit recommendation for {weather_location}, {country} with this weather:
+            - Temperature: {temp}°C (feels like {feels_like}°C)
+            - Humidity: {humidity}%
+            - Wind: {wind_speed} km/h
+            - Conditions: {conditions}
+            - Style: {style_preference}
+            
+            Be EXTREMELY creative, diverse, and impressive. Use vivid language, unexpected combinations, and trendy details.
+            
+            Structure your response EXACTLY like this format:
+            
+            🎽 Your Look, Tailored to [Creative Weather Description] & [Location Vibe]
+            [Poetic weather mood description with personality and flair]
+            
+            🧢 Top Layer: [Ultra-specific trendy item with creative description and styling details]
+            👕 Mid-Layer: [Innovative layering piece with color/texture details and style reasoning]  
+            👖 Bottoms: [Fashion-forward bottom with cut, fit, and trend details]
+            👟 Shoes: [Stylish footwear with brand vibes and weather-specific features]
+            🧤 Accessories: [2-3 statement accessories with styling impact and practical benefits]
+            
+            🧠 Smart Layering Tip:
+            [Professional styling secret with specific technique for the weather and style - be detailed and expert-level]
+            
+            🌍 Local Flavor Add-On:
+            [Cultural fashion insight specific to the location with local style trends and colors]
+            
+            🎒 Your Pack & Prep List:
+            [6 practical items with emojis, each with specific brand vibes or creative descriptions]
+            
+            🎵 [Ultra-creative playlist name mixing weather/location/style] 🎧
+            
+            💬 Confidence Closer:
+            [Motivational, inspiring closer that makes them feel like a fashion icon. End with a powerful quote in quotes.]
+            
+            Make this recommendation UNFORGETTABLE - use unexpected color combinations, trendy pieces, street style inspiration, and make them feel like they're walking a runway in {weather_location}!
+            """
+
+def _style_line(line: str) -> str:
+    """Color a stripped recommendation line by its leading emoji, adding spacing around major sections."""
+    style = _LINE_STYLES.get(line[0])
+    if style is None or not line.startswith(style[0]):
+        # Regular content lines
+        return line
+    _, before, color, after = style
+    return f"{before}{color}{line}{_RESET}{after}"
+
+@dataclass(frozen=True, slots=True)
+class WeatherFacts:
+    """
+    Weather fields used to build prompts and headers, extracted once per query.
+    Missing values are "unknown", as in the raw API response handling.
+    """
+    temp: Any
+    feels_like: Any
+    humidity: Any
+    wind_speed: Any
+    conditions: str
+    name: str
+    country: str
+    
+    @classmethod
+    def from_api(cls, data: Dict[str, Any], location: str = "") -> "WeatherFacts":
+        """
+        Extract the facts from an OpenWeatherMap response.
+        
+        Args:
+            data: Weather data from the API
+            location: Name to use if the response doesn't include one
+        """
+        main = data.get("main") or {}
+        weather = data.get("weather")
+        return cls(
+            temp=main.get("temp", "unknown"),
+            feels_like=main.get("feels_like", "unknown"),
+            humidity=main.get("humidity", "unknown"),
+            wind_speed=(data.get("wind") or {}).get("speed", "unknown"),
+            conditions=weather[0].get("description", "unknown") if weather else "unknown",
+            name=data.get("name", location),
+            country=(data.get("sys") or {}).get("country", "")
+        )
+    
+    @property
+    def description(self) -> str:
+        """Short description of the conditions for the recommendation header."""
+        # Parse the numeric values once; missing or unparsable values are skipped
+        try:
+            wind = float(self.wind_speed)
+        except (TypeError, ValueError):
+            wind = None
+        try:
+            temp = float(self.temp)
+        except (TypeError, ValueError):
+            temp = None
+        
+        description = _WEATHER_DESCRIPTIONS.get(self.conditions.lower(), self.conditions.title())
+        if wind is not None and wind > 15:
+            description += " & Breezy" if wind < 25 else " & Windy"
+        if temp is not None:
+            if temp <= 10:
+                description += " & Cool" if temp > 5 else " & Cold"
+            elif temp >= 25:
+                description += " & Warm" if temp < 30 else " & Hot"
+        return description
 
 class OutfitGenerator:
     """
@@ -26,55 +194,158 @@ class OutfitGenerator:
         Returns:
             Tuple containing weather data, outfit recommendation, and forecast (if requested)
         """
-        # Parse time information from query
-        is_future, hours_offset = parse_time_from_query(query)
+        return asyncio.run(self.process_query_async(query, style_preference, show_forecast))
+    
+    async def process_query_async(self, query: str, style_preference: str, show_forecast: bool = False) -> Tuple[str, str, str]:
+        """
+        Async version of process_query.
+        The LLM call and the forecast fetch only depend on the current weather,
+        so they run concurrently in worker threads once it is known.
+        """
+        location, lat, lon, is_future, weather_data = await asyncio.to_thread(self._fetch_query_weather, query)
+        facts = WeatherFacts.from_api(weather_data, location)
         
-        # Extract location from query
-        location = extract_location(query)
+        # Format weather information for display
+        weather_info = colorize_weather(weather_data)
         
-        lat, lon = None, None
-        if not location:
-            raise ValueError("Couldn't identify a location in your query. Please try again with a clearer location.")
+        # Generate enhanced outfit recommendation, alongside the forecast data if requested
+        recommendation_task = asyncio.to_thread(self._recommend_outfit, weather_data, facts, location, style_preference, is_future)
+        if show_forecast:
+            outfit_recommendation, forecast_info = await asyncio.gather(
+                recommendation_task,
+                asyncio.to_thread(self._get_forecast_info, location, lat, lon)
+            )
+        else:
+            outfit_recommendation = await recommendation_task
+            forecast_info = ""
         
-        # Handle special case for current location
-        if location == "CURRENT_LOCATION":
-            location, lat, lon = get_current_location()
-            print(f"{Fore.GREEN}📍 Using your current location: {Fore.CYAN}{location}{Style.RESET_ALL}")
+        # Format outfit recommendation with enhanced header
+        formatted_recommendation = self._format_enhanced_recommendation(outfit_recommendation, facts, style_preference)
         
-        # Get weather data
-        weather_data = self.weather_api.get_weather_for_query(location, is_future, hours_offset, lat, lon)
+        return weather_info, formatted_recommendation, forecast_info
+    
+    async def process_queries(self, queries: List[str], style_preference: str, show_forecast: bool = False, max_concurrency: int = 10) -> List[Any]:
+        """
+        Process several queries concurrently.
         
-        # Format weather information for display
-        weather_info = colorize_weather(weather_data)
+        Args:
+            queries: Natural language queries for location and time
+            style_preference: User's style preference, shared by all queries
+            show_forecast: Whether to include multi-day forecast
+            max_concurrency: Maximum number of queries in flight at once
+            
+        Returns:
+            One entry per query, in order: the process_query result tuple,
+            or the exception raised while processing that query
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def process_one(query: str) -> Tuple[str, str, str]:
+            async with semaphore:
+                return await self.process_query_async(query, style_preference, show_forecast)
         
+        return await asyncio.gather(*(process_one(query) for query in queries), return_exceptions=True)
+    
+    def _recommend_outfit(self, weather_data: Dict[str, Any], facts: WeatherFacts, location: str, style_preference: str, is_future: bool) -> str:
+        """Generate the outfit recommendation, falling back to the built-in one if the LLM fails."""
         # Generate enhanced outfit recommendation using the LLMClient's enhanced method
         try:
-            outfit_recommendation = self._generate_enhanced_outfit_recommendation(
+            return self._generate_enhanced_outfit_recommendation(
                 weather_data=weather_data,
+                facts=facts,
                 location=location,
                 style_preference=style_preference,
                 is_future=is_future
             )
         except Exception as e:
-            print(f"{Fore.YELLOW}⚠️  LLM generation failed: {e}{Style.RESET_ALL}")
+            print(f"{_YELLOW}⚠️  LLM generation failed: {e}{_RESET}")
+            # Use the LLMClient's fallback method which already has the enhanced format
+            return self.llm_client._create_fallback_recommendation(weather_data, location, style_preference)
+    
+    def stream_query(self, query: str, style_preference: str, show_forecast: bool = False) -> Iterator[Tuple[str, str]]:
+        """
+        Process a natural language query, streaming the outfit recommendation as it is generated.
+        
+        Args:
+            query: Natural language query for location and time
+            style_preference: User's style preference
+            show_forecast: Whether to include multi-day forecast
+            
+        Yields:
+            (event, text) tuples, in order: ("weather", weather info), ("header",
+            recommendation header), any number of ("delta", raw recommendation chunk),
+            ("outfit", formatted recommendation, starting with the header) and
+            ("forecast", forecast info) if requested
+        """
+        location, lat, lon, is_future, weather_data = self._fetch_query_weather(query)
+        yield "weather", colorize_weather(weather_data)
+        facts = WeatherFacts.from_api(weather_data, location)
+        yield "header", self._format_recommendation_header(facts, style_preference)
+        
+        chunks = []
+        try:
+            for delta in self.llm_client.stream_outfit_recommendation(
+                weather_data=weather_data,
+                location=location,
+                style_preference=style_preference,
+                is_future=is_future
+            ):
+                chunks.append(delta)
+                yield "delta", delta
+            outfit_recommendation = "".join(chunks).strip()
+            
+            # Same format check as the non-streaming path
+            if "🎽" not in outfit_recommendation:
+                outfit_recommendation = self._generate_creative_recommendation(
+                    outfit_recommendation, weather_data, facts, location, style_preference
+                )
+        except Exception as e:
+            print(f"{_YELLOW}⚠️  LLM generation failed: {e}{_RESET}")
             # Use the LLMClient's fallback method which already has the enhanced format
             outfit_recommendation = self.llm_client._create_fallback_recommendation(weather_data, location, style_preference)
         
-        # Format outfit recommendation with enhanced header
-        formatted_recommendation = self._format_enhanced_recommendation(outfit_recommendation, weather_data, location, style_preference)
+        # The formatted recommendation replaces the streamed raw text
+        yield "outfit", self._format_enhanced_recommendation(outfit_recommendation, facts, style_preference)
         
-        # Get and format forecast data if requested
-        forecast_info = ""
         if show_forecast:
-            try:
-                forecast_data = self.weather_api.get_multi_day_forecast(location, lat, lon)
-                forecast_info = format_forecast_display(forecast_data)
-            except Exception as e:
-                forecast_info = f"\n{Fore.YELLOW}⚠️  Could not retrieve extended forecast: {str(e)}{Style.RESET_ALL}"
+            yield "forecast", self._get_forecast_info(location, lat, lon)
+    
+    def _fetch_query_weather(self, query: str) -> Tuple[str, Optional[float], Optional[float], bool, Dict[str, Any]]:
+        """
+        Resolve the location and time in a query and fetch the matching weather.
         
-        return weather_info, formatted_recommendation, forecast_info
+        Returns:
+            Tuple of (location, lat, lon, is_future, weather_data)
+        """
+        # Parse time information from query
+        is_future, hours_offset = parse_time_from_query(query)
+        
+        # Extract location from query
+        location = extract_location(query)
+        
+        lat, lon = None, None
+        if not location:
+            raise ValueError("Couldn't identify a location in your query. Please try again with a clearer location.")
+        
+        # Handle special case for current location
+        if location == "CURRENT_LOCATION":
+            location, lat, lon = get_current_location()
+            print(f"{_GREEN}📍 Using your current location: {_CYAN}{location}{_RESET}")
+        
+        # Get weather data; WeatherAPI serves recent responses from its cache
+        weather_data = self.weather_api.get_weather_for_query(location, is_future, hours_offset, lat, lon)
+        
+        return location, lat, lon, is_future, weather_data
+    
+    def _get_forecast_info(self, location: str, lat: Optional[float], lon: Optional[float]) -> str:
+        """Fetch and format the multi-day forecast, returning a warning message on failure."""
+        try:
+            forecast_data = self.weather_api.get_multi_day_forecast(location, lat, lon)
+            return format_forecast_display(forecast_data)
+        except Exception as e:
+            return f"\n{_YELLOW}⚠️  Could not retrieve extended forecast: {str(e)}{_RESET}"
     
-    def _generate_enhanced_outfit_recommendation(self, weather_data: Dict[str, Any], location: str, style_preference: str, is_future: bool) -> str:
+    def _generate_enhanced_outfit_recommendation(self, weather_data: Dict[str, Any], facts: WeatherFacts, location: str, style_preference: str, is_future: bool) -> str:
         """Generate an enhanced outfit recommendation with detailed formatting."""
         # Use the LLMClient's generate_outfit_recommendation method which already has enhanced prompting
         recommendation = self.llm_client.generate_outfit_recommendation(
@@ -86,122 +357,80 @@ class OutfitGenerator:
         
         # If the recommendation doesn't have the proper format, try again with direct prompt
         if "🎽" not in recommendation:
-            # Extract weather information for custom prompt
-            temp = weather_data.get("main", {}).get("temp", "unknown")
-            feels_like = weather_data.get("main", {}).get("feels_like", "unknown")
-            humidity = weather_data.get("main", {}).get("humidity", "unknown")
-            wind_speed = weather_data.get("wind", {}).get("speed", "unknown")
-            conditions = weather_data.get("weather", [{}])[0].get("description", "unknown") if weather_data.get("weather") else "unknown"
-            weather_location = weather_data.get("name", location)
-            country = weather_data.get("sys", {}).get("country", "")
-            
-            # Create ultra-creative prompt for diverse recommendations
-            creative_prompt = f"""
-            You are WeatherWear, the world's most creative and diverse fashion stylist who creates stunning, unique outfit recommendations. 
-            Create an absolutely captivating outfit recommendation for {weather_location}, {country} with this weather:
-            - Temperature: {temp}°C (feels like {feels_like}°C)
-            - Humidity: {humidity}%
-            - Wind: {wind_speed} km/h
-            - Conditions: {conditions}
-            - Style: {style_preference}
-            
-            Be EXTREMELY creative, diverse, and impressive. Use vivid language, unexpected combinations, and trendy details.
-            
-            Structure your response EXACTLY like this format:
-            
-            🎽 Your Look, Tailored to [Creative Weather Description] & [Location Vibe]
-            [Poetic weather mood description with personality and flair]
-            
-            🧢 Top Layer: [Ultra-specific trendy item with creative description and styling details]
-            👕 Mid-Layer: [Innovative layering piece with color/texture details and style reasoning]  
-            👖 Bottoms: [Fashion-forward bottom with cut, fit, and trend details]
-            👟 Shoes: [Stylish footwear with brand vibes and weather-specific features]
-            🧤 Accessories: [2-3 statement accessories with styling impact and practical benefits]
-            
-            🧠 Smart Layering Tip:
-            [Professional styling secret with specific technique for the weather and style - be detailed and expert-level]
-            
-            🌍 Local Flavor Add-On:
-            [Cultural fashion insight specific to the location with local style trends and colors]
-            
-            🎒 Your Pack & Prep List:
-            [6 practical items with emojis, each with specific brand vibes or creative descriptions]
-            
-            🎵 [Ultra-creative playlist name mixing weather/location/style] 🎧
-            
-            💬 Confidence Closer:
-            [Motivational, inspiring closer that makes them feel like a fashion icon. End with a powerful quote in quotes.]
-            
-            Make this recommendation UNFORGETTABLE - use unexpected color combinations, trendy pieces, street style inspiration, and make them feel like they're walking a runway in {weather_location}!
-            """
-            
-            # Try to generate with the creative prompt
-            if self.llm_client.client is not None:
-                try:
-                    chat_completion = self.llm_client.client.chat.completions.create(
-                        messages=[{"role": "user", "content": creative_prompt}],
-                        model=self.llm_client.model,
-                        temperature=0.9,  # Higher creativity
-                        max_tokens=1000,  # More space for creativity
-                        top_p=0.95
-                    )
-                    recommendation = chat_completion.choices[0].message.content.strip()
-                except Exception as e:
-                    print(f"{Fore.YELLOW}⚠️  Creative prompt failed: {e}{Style.RESET_ALL}")
-                    # Fall back to the LLMClient's fallback
-                    recommendation = self.llm_client._create_fallback_recommendation(weather_data, location, style_preference)
+            recommendation = self._generate_creative_recommendation(recommendation, weather_data, facts, location, style_preference)
         
         return recommendation
     
-    def _format_enhanced_recommendation(self, recommendation: str, weather_data: Dict[str, Any], location: str, style_preference: str) -> str:
+    def _generate_creative_recommendation(self, recommendation: str, weather_data: Dict[str, Any], facts: WeatherFacts, location: str, style_preference: str) -> str:
+        """
+        Retry a recommendation that misses the expected format with the creative prompt.
+        
+        Args:
+            recommendation: The badly formatted recommendation, returned if no LLM is available
+            weather_data: Weather data dictionary
+            facts: Weather readings parsed from weather_data
+            location: Location name
+            style_preference: User's style preference
+        
+        Returns:
+            The creative recommendation, or the fallback recommendation if generation fails
+        """
+        # Create ultra-creative prompt for diverse recommendations.
+        # Temperatures are rounded so identical weather yields identical prompts.
+        creative_prompt = _CREATIVE_PROMPT_TMPL.format(
+            weather_location=facts.name,
+            country=facts.country,
+            temp=_round_number(facts.temp),
+            feels_like=_round_number(facts.feels_like),
+            humidity=facts.humidity,
+            wind_speed=_round_number(facts.wind_speed),
+            conditions=facts.conditions,
+            style_preference=style_preference
+        )
+        
+        # Try to generate with the creative prompt, reusing a cached response if there is one
+        cache_key = LLMCache.make_key(self.llm_client.model, 0.9, creative_prompt)
+        cached = self.llm_client.cache.get(cache_key)
+        if cached is not None:
+            recommendation = cached
+        elif self.llm_client.client is not None:
+            try:
+                chat_completion = self.llm_client.client.chat.completions.create(
+                    messages=[{"role": "user", "content": creative_prompt}],
+                    model=self.llm_client.model,
+                    temperature=0.9,  # Higher creativity
+                    max_tokens=1000,  # More space for creativity
+                    top_p=0.95
+                )
+                recommendation = chat_completion.choices[0].message.content.strip()
+                self.llm_client.cache.set(cache_key, recommendation)
+            except Exception as e:
+                print(f"{_YELLOW}⚠️  Creative prompt failed: {e}{_RESET}")
+                # Fall back to the LLMClient's fallback
+                recommendation = self.llm_client._create_fallback_recommendation(weather_data, location, style_preference)
+        
+        return recommendation
+    
+    def _format_enhanced_recommendation(self, recommendation: str, facts: WeatherFacts, style_preference: str) -> str:
         """Format the recommendation with enhanced header and beautiful styling."""
-        weather_location = weather_data.get("name", location)
-        country = weather_data.get("sys", {}).get("country", "")
-        conditions = weather_data.get("weather", [{}])[0].get("description", "unknown") if weather_data.get("weather") else "unknown"
-        temp = weather_data.get("main", {}).get("temp", "unknown")
-        wind_speed = weather_data.get("wind", {}).get("speed", "unknown")
-        
-        # Create sophisticated mood tags based on conditions and style
-        mood_tags = {
-            ("casual", "clear"): "Effortless Sunshine Vibes",
-            ("casual", "clouds"): "Cozy Urban Explorer", 
-            ("casual", "rain"): "Chic Storm Chaser",
-            ("casual", "snow"): "Winter Wonderland Wanderer",
-            ("formal", "clear"): "Polished Perfection",
-            ("formal", "clouds"): "Sophisticated City Dweller",
-            ("formal", "rain"): "Executive Weather Warrior", 
-            ("formal", "snow"): "Elegant Winter Professional",
-            ("sporty", "clear"): "Athletic Sunshine Ready",
-            ("sporty", "clouds"): "Urban Athlete Meets Cool Breeze",
-            ("sporty", "rain"): "Storm-Proof Fitness Champion",
-            ("sporty", "snow"): "Winter Sports Enthusiast"
-        }
-        
-        # Create weather condition description
-        weather_descriptions = {
-            "clear": "Bright & Beautiful",
-            "clear sky": "Bright & Beautiful",
-            "few clouds": "Partly Cloudy & Pleasant", 
-            "scattered clouds": "Cloudy with Character",
-            "broken clouds": "Dramatically Overcast",
-            "overcast clouds": "Moody & Atmospheric",
-            "light rain": "Gentle Drizzle",
-            "moderate rain": "Refreshing Rainfall", 
-            "heavy rain": "Intense Downpour",
-            "light snow": "Delicate Snowfall",
-            "snow": "Winter Wonderland",
-            "mist": "Mysterious & Misty",
-            "fog": "Dreamy & Ethereal"
-        }
+        header = self._format_recommendation_header(facts, style_preference)
+        
+        # Format the recommendation content with better spacing
+        formatted_content = self._add_proper_spacing_to_recommendation(recommendation)
+        
+        # Create beautiful footer
+        footer = f"\n{_CYAN}{'═' * 60}{_RESET}\n"
+        
+        return f"{header}\n{formatted_content}{footer}"
+    
+    def _format_recommendation_header(self, facts: WeatherFacts, style_preference: str) -> str:
+        """Build the recommendation header: the title and the location & style box."""
+        weather_location = facts.name
+        country = facts.country
+        conditions = facts.conditions
         
         # Determine weather description
-        weather_desc = weather_descriptions.get(conditions.lower(), conditions.title())
-        if wind_speed and wind_speed != "unknown" and float(wind_speed) > 15:
-            weather_desc += " & Breezy" if float(wind_speed) < 25 else " & Windy"
-        if temp != "unknown" and float(temp) <= 10:
-            weather_desc += " & Cool" if float(temp) > 5 else " & Cold"
-        elif temp != "unknown" and float(temp) >= 25:
-            weather_desc += " & Warm" if float(temp) < 30 else " & Hot"
+        weather_desc = facts.description
             
         # Get mood tag
         style_lower = style_preference.lower()
@@ -213,64 +442,26 @@ class OutfitGenerator:
         if not condition_key:
             condition_key = "clear"
             
-        mood_tag = mood_tags.get((style_lower, condition_key), f"{style_preference.title()} & Weather-Ready")
+        mood_tag = _MOOD_TAGS.get((style_lower, condition_key), f"{style_preference.title()} & Weather-Ready")
         
         # Create beautiful header with proper spacing
-        header_top = f"\n{Fore.CYAN}{'═' * 60}"
-        header_title = f"{Fore.CYAN}👗  WEATHERWEAR STYLE RECOMMENDATION"
-        header_separator = f"{Fore.CYAN}{'═' * 60}{Style.RESET_ALL}"
+        header_top = f"\n{_CYAN}{'═' * 60}"
+        header_title = f"{_CYAN}👗  WEATHERWEAR STYLE RECOMMENDATION"
+        header_separator = f"{_CYAN}{'═' * 60}{_RESET}"
         
         # Create organized recommendation info box
         rec_info = f"""
-{Fore.WHITE}┌─ Location & Style ───────────────────────────────────────┐
-{Fore.WHITE}│ 🏙️  {Fore.YELLOW}{weather_location}, {country}{Style.RESET_ALL}{Fore.WHITE}                                        │
-{Fore.WHITE}│ 👟  Style: {Fore.MAGENTA}{style_preference.title()} & Stylish{Style.RESET_ALL}{Fore.WHITE}                            │
-{Fore.WHITE}│ 🌬️  Conditions: {Fore.GREEN}{weather_desc}{Style.RESET_ALL}{Fore.WHITE}                           │
-{Fore.WHITE}│ 💡  Mood: "{Fore.CYAN}{mood_tag}{Style.RESET_ALL}{Fore.WHITE}"                         │
-{Fore.WHITE}└──────────────────────────────────────────────────────────┘{Style.RESET_ALL}
+{_WHITE}┌─ Location & Style ───────────────────────────────────────┐
+{_WHITE}│ 🏙️  {_YELLOW}{weather_location}, {country}{_RESET}{_WHITE}                                        │
+{_WHITE}│ 👟  Style: {_MAGENTA}{style_preference.title()} & Stylish{_RESET}{_WHITE}                            │
+{_WHITE}│ 🌬️  Conditions: {_GREEN}{weather_desc}{_RESET}{_WHITE}                           │
+{_WHITE}│ 💡  Mood: "{_CYAN}{mood_tag}{_RESET}{_WHITE}"                         │
+{_WHITE}└──────────────────────────────────────────────────────────┘{_RESET}
 """
         
-        # Format the recommendation content with better spacing
-        formatted_content = self._add_proper_spacing_to_recommendation(recommendation)
-        
-        # Create beautiful footer
-        footer = f"\n{Fore.CYAN}{'═' * 60}{Style.RESET_ALL}\n"
-        
-        return f"{header_top}\n{header_title}\n{header_separator}{rec_info}\n{formatted_content}{footer}"
+        return f"{header_top}\n{header_title}\n{header_separator}{rec_info}"
     
     def _add_proper_spacing_to_recommendation(self, recommendation: str) -> str:
         """Add proper spacing and formatting to the recommendation content."""
-        lines = recommendation.split('\n')
-        formatted_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Add extra spacing around major sections
-            if line.startswith('🎽'):
-                formatted_lines.append(f"\n{Fore.YELLOW}{line}{Style.RESET_ALL}")
-                formatted_lines.append("")
-            elif line.startswith(('🧢', '👕', '👖', '👟', '🧤')):
-                formatted_lines.append(f"{Fore.WHITE}{line}{Style.RESET_ALL}")
-            elif line.startswith('🧠'):
-                formatted_lines.append(f"\n{Fore.CYAN}{line}{Style.RESET_ALL}")
-            elif line.startswith('🌍'):
-                formatted_lines.append(f"\n{Fore.GREEN}{line}{Style.RESET_ALL}")
-            elif line.startswith('🎒'):
-                formatted_lines.append(f"\n{Fore.BLUE}{line}{Style.RESET_ALL}")
-            elif line.startswith('🎵'):
-                formatted_lines.append(f"\n{Fore.MAGENTA}{line}{Style.RESET_ALL}")
-            elif line.startswith('💬'):
-                formatted_lines.append(f"\n{Fore.YELLOW}{line}{Style.RESET_ALL}")
-            elif line.startswith('🗣️'):
-                formatted_lines.append(f"{Fore.GREEN}{line}{Style.RESET_ALL}")
-            elif line.startswith(('🧴', '🔋', '🧦', '🧃', '🧼', '🌂', '🕶️')):
-                formatted_lines.append(f"  {Fore.WHITE}{line}{Style.RESET_ALL}")
-            else:
-                # Regular content lines
-                if line.strip():
-                    formatted_lines.append(f"{line}")
-        
-        return '\n'.join(formatted_lines)
\ No newline at end of file
+        # Style each non-blank line, dropping the blank ones
+        return '\n'.join(_style_line(line) for line in map(str.strip, recommendation.split('\n')) if line)
\ No newline at end of file
@@ -4,11 +4,50 @@ import json
 from typing import Dict, Any, Tuple, Optional
 from datetime import datetime, timedelta
 from colorama import Fore, Style, init
-import requests
-from geopy.geocoders import Nominatim
+from functools import lru_cache
+from .cache import TTLCache
 
-# Initialize colorama for cross-platform colored terminal output
-init(autoreset=True)
+# ANSI color codes bound once at import, so formatting code reads
+# plain module globals instead of colorama attributes
+_BLUE = Fore.BLUE
+_CYAN = Fore.CYAN
+_GREEN = Fore.GREEN
+_MAGENTA = Fore.MAGENTA
+_WHITE = Fore.WHITE
+_YELLOW = Fore.YELLOW
+_RESET = Style.RESET_ALL
+
+# Whether colorama has already wrapped stdout/stderr
+_colorama_initialized = False
+
+def init_colorama() -> None:
+    """
+    Initialize colorama for cross-platform colored terminal output.
+    Called by the entry points rather than at import, so importing this
+    module (e.g. in a WSGI worker) leaves stdout and stderr alone.
+    Safe to call repeatedly; stdout and stderr are only wrapped once.
+    """
+    global _colorama_initialized
+    if not _colorama_initialized:
+        init(autoreset=True)
+        _colorama_initialized = True
+
+# Words indicating the query refers to a future time. "tonight" is listed
+# explicitly since whole-word matching no longer finds "night" inside it.
+_FUTURE_RE = re.compile(r'\b(tomorrow|next|later|upcoming|evening|night|tonight|afternoon|morning)\b')
+
+# Time-related phrases stripped from queries before extracting the location
+_TIME_PHRASE_RE = re.compile(r'\b(?:tomorrow|today|this afternoon|this evening|tonight|in the morning|next week|weekend)\b')
+
+# Location shorthand terms that need geolocation. Matched anywhere in the
+# query, like the substring checks this replaces.
+_SHORTCUT_RE = re.compile(r'here|my location|my city|current location|my area|where i am|current position')
+
+# Prepositions and articles that are never part of a location name
+_STOPWORDS = frozenset({"in", "at", "for", "the", "a", "an"})
+
+# IP-based location data from ipinfo.io, refreshed every 15 minutes
+_IPINFO_CACHE = TTLCache(maxsize=1, ttl=900)
 
 def load_env_variable(var_name: str, default: str = None) -> str:
     """
@@ -19,10 +58,21 @@ def load_env_variable(var_name: str, default: str = None) -> str:
         raise ValueError(f"Environment variable {var_name} not set and no default provided.")
     return value
 
-def parse_time_from_query(query: str) -> Tuple[bool, int]:
+def _round_number(value: Any) -> Any:
+    """
+    Round a numeric weather value to an integer, passing other values through.
+    Used in LLM prompts so nearly identical readings give identical prompts.
+    """
+    return round(value) if isinstance(value, (int, float)) else value
+
+def parse_time_from_query(query: str, now: Optional[datetime] = None) -> Tuple[bool, int]:
     """
     Extract time information from a user query.
     
+    Args:
+        query: Natural language query
+        now: Reference time for relative phrases, defaults to the current time
+        
     Returns:
         Tuple[bool, int]: (is_future, hours_offset)
         - is_future: Whether the query refers to a future time
@@ -31,37 +81,39 @@ def parse_time_from_query(query: str) -> Tuple[bool, int]:
     # Default to current time
     is_future = False
     hours_offset = 0
+    if now is None:
+        now = datetime.now()
     
-    # Look for time indicators
-    query_lower = query.lower()
+    # Look for whole-word time indicators
+    indicators = set(_FUTURE_RE.findall(query.lower()))
     
     # Check for future indicators
-    future_indicators = ["tomorrow", "next", "later", "upcoming", "evening", "night", "afternoon", "morning"]
-    if any(indicator in query_lower for indicator in future_indicators):
+    if indicators:
         is_future = True
+        is_evening = not indicators.isdisjoint(("evening", "night", "tonight"))
         
         # Determine approximate hours offset
-        if "tomorrow" in query_lower:
+        if "tomorrow" in indicators:
             hours_offset = 24
             
             # Refine by time of day
-            if "morning" in query_lower:
+            if "morning" in indicators:
                 hours_offset = 24  # Default to 24 hours if just "tomorrow morning"
-            elif "afternoon" in query_lower:
+            elif "afternoon" in indicators:
                 hours_offset = 30  # Roughly 6 hours past morning
-            elif "evening" in query_lower or "night" in query_lower:
+            elif is_evening:
                 hours_offset = 36  # Roughly 12 hours past morning
         
-        elif "evening" in query_lower or "night" in query_lower:
+        elif is_evening:
             # If just evening today
-            current_hour = datetime.now().hour
+            current_hour = now.hour
             if current_hour < 18:  # If it's before 6 PM
                 hours_offset = 18 - current_hour
             else:
                 hours_offset = 0  # Already evening
         
-        elif "afternoon" in query_lower:
-            current_hour = datetime.now().hour
+        elif "afternoon" in indicators:
+            current_hour = now.hour
             if current_hour < 12:  # If it's before noon
                 hours_offset = 12 - current_hour
             else:
@@ -75,27 +127,16 @@ def extract_location(query: str) -> str:
     Basic implementation - for complex queries, consider NLP libraries.
     """
     # Check for location shorthand terms that need geolocation
-    location_shortcuts = ["here", "my location", "my city", "current location", "my area", "where i am", "current position"]
     query_lower = query.lower()
-    
-    for shortcut in location_shortcuts:
-        if shortcut in query_lower:
-            return "CURRENT_LOCATION"
+    if _SHORTCUT_RE.search(query_lower):
+        return "CURRENT_LOCATION"
     
     # Strip out common time-related phrases
-    time_phrases = ["tomorrow", "today", "this afternoon", "this evening", 
-                   "tonight", "in the morning", "next week", "weekend"]
-    
-    cleaned_query = query_lower
-    for phrase in time_phrases:
-        cleaned_query = cleaned_query.replace(phrase, "")
-    
-    # Remove prepositions and articles
-    words = cleaned_query.split()
-    filtered_words = [w for w in words if w not in ["in", "at", "for", "the", "a", "an"]]
+    cleaned_query = _TIME_PHRASE_RE.sub("", query_lower)
     
+    # Remove prepositions and articles.
     # Rejoin remaining words - this is likely our location
-    return " ".join(filtered_words).strip()
+    return " ".join(w for w in cleaned_query.split() if w not in _STOPWORDS).strip()
 
 def colorize_weather(weather_data: Dict[str, Any]) -> str:
     """
@@ -107,24 +148,24 @@ def colorize_weather(weather_data: Dict[str, Any]) -> str:
     humidity = weather_data.get("main", {}).get("humidity", "N/A")
     wind_speed = weather_data.get("wind", {}).get("speed", "N/A")
     conditions = weather_data.get("weather", [{}])[0].get("description", "N/A") if weather_data.get("weather") else "N/A"
-    location = f"{weather_data.get('name', 'Unknown')}, {weather_data.get('sys', {}).get('country', '')}"
+    name = weather_data.get('name', 'Unknown')
+    country = weather_data.get('sys', {}).get('country', '')
     
-    # Format output with colors
-    output = [
-        f"Weather in {Fore.CYAN}{location}{Style.RESET_ALL}:",
-        f"🌡️ Temperature: {Fore.YELLOW}{temp}°C{Style.RESET_ALL} (feels like {feels_like}°C)",
-        f"💧 Humidity: {Fore.BLUE}{humidity}%{Style.RESET_ALL}",
-        f"💨 Wind: {Fore.GREEN}{wind_speed} km/h{Style.RESET_ALL}",
-        f"☁️ Conditions: {Fore.MAGENTA}{conditions.title()}{Style.RESET_ALL}"
-    ]
-    
-    return "\n".join(output)
+    # Format output with colors. The adjacent literals are joined at compile
+    # time, so this builds the result in one go rather than joining a list.
+    return (
+        f"Weather in {_CYAN}{name}, {country}{_RESET}:\n"
+        f"🌡️ Temperature: {_YELLOW}{temp}°C{_RESET} (feels like {feels_like}°C)\n"
+        f"💧 Humidity: {_BLUE}{humidity}%{_RESET}\n"
+        f"💨 Wind: {_GREEN}{wind_speed} km/h{_RESET}\n"
+        f"☁️ Conditions: {_MAGENTA}{conditions.title()}{_RESET}"
+    )
 
 def format_outfit_recommendation(recommendation: str) -> str:
     """
     Format the outfit recommendation with colors.
     """
-    return f"\n{Fore.GREEN}Outfit recommendation:{Style.RESET_ALL}\n{recommendation}"
+    return f"\n{_GREEN}Outfit recommendation:{_RESET}\n{recommendation}"
 
 def validate_style_preference(preference: str) -> str:
     """
@@ -138,9 +179,59 @@ def validate_style_preference(preference: str) -> str:
     elif not preference:
         return "casual"  # Default
     else:
-        print(f"{Fore.YELLOW}Warning: '{preference}' is not a recognized style. Using 'casual' instead.{Style.RESET_ALL}")
+        print(f"{_YELLOW}Warning: '{preference}' is not a recognized style. Using 'casual' instead.{_RESET}")
         return "casual"
 
+@lru_cache(maxsize=1)
+def _get_session():
+    """
+    Return the shared HTTP session, so repeated lookups reuse pooled
+    connections, with retries for transient failures.
+    requests is imported here since only current-location queries need it.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3)
+    ))
+    return session
+
+def _fetch_ipinfo() -> Dict[str, Any]:
+    """
+    Fetch IP-based location data from ipinfo.io.
+    Successful results are cached for 15 minutes since the IP rarely changes.
+    """
+    data = _IPINFO_CACHE.get("ipinfo")
+    if data is None:
+        # Use ipinfo.io to get location based on IP (no API key required for basic usage)
+        response = _get_session().get('https://ipinfo.io/json', timeout=3)
+        response.raise_for_status()
+        data = response.json()
+        
+        # Only cache a usable location, so an error reply isn't reused
+        if 'loc' in data:
+            _IPINFO_CACHE.set("ipinfo", data)
+    return data
+
+@lru_cache(maxsize=1024)
+def _reverse_geocode(lat: float, lng: float) -> Optional[str]:
+    """
+    Look up the city name for coordinates with Nominatim.
+    Memoized so identical coordinates don't count against Nominatim's 1 req/s policy.
+    """
+    from geopy.geocoders import Nominatim
+    
+    geolocator = Nominatim(user_agent="weatherwear")
+    address = geolocator.reverse(f"{lat}, {lng}")
+    if address:
+        return address.raw.get('address', {}).get('city')
+    return None
+
 def get_current_location() -> Tuple[str, float, float]:
     """
     Get the user's current location using IP-based geolocation.
@@ -148,10 +239,11 @@ def get_current_location() -> Tuple[str, float, float]:
     Returns:
         Tuple[str, float, float]: (location_name, latitude, longitude)
     """
+    # geopy is only needed for current-location queries, so it is imported lazily
+    from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+    
     try:
-        # Use ipinfo.io to get location based on IP (no API key required for basic usage)
-        response = requests.get('https://ipinfo.io/json')
-        data = response.json()
+        data = _fetch_ipinfo()
         
         # Extract location data
         location = data.get('city', 'Unknown')
@@ -164,22 +256,20 @@ def get_current_location() -> Tuple[str, float, float]:
         lat = float(coords[0])
         lng = float(coords[1])
         
-        # Use reverse geocoding to get a more detailed location name
-        geolocator = Nominatim(user_agent="weatherwear")
+        # Use reverse geocoding to get a more detailed location name.
+        # Coordinates are rounded (~100 m) so nearby lookups share a cache entry.
         try:
-            address = geolocator.reverse(f"{lat}, {lng}")
-            if address:
-                city = address.raw.get('address', {}).get('city')
-                if city:
-                    location = city
-        except:
+            city = _reverse_geocode(round(lat, 3), round(lng, 3))
+            if city:
+                location = city
+        except (GeocoderTimedOut, GeocoderServiceError):
             # If reverse geocoding fails, use the IP-based city
             pass
             
         return location, lat, lng
         
     except Exception as e:
-        print(f"{Fore.YELLOW}Warning: Could not determine current location. {str(e)}{Style.RESET_ALL}")
+        print(f"{_YELLOW}Warning: Could not determine current location. {str(e)}{_RESET}")
         # Return a default value
         return "New York", 40.7128, -74.0060  # Default to New York if geolocation fails
 
@@ -196,42 +286,26 @@ def format_forecast_display(forecast_data: Dict[str, Any]) -> str:
     if not forecast_data or 'list' not in forecast_data:
         return "No forecast data available"
     
-    # Group forecasts by day
+    # Pick each day's forecast in a single pass: the first one around noon
+    # (11:00-14:59), or the day's first forecast if there is none
     days = {}
     for item in forecast_data['list']:
         dt = datetime.fromtimestamp(item['dt'])
-        day_key = dt.strftime('%Y-%m-%d')
+        day = dt.date()
+        is_mid_day = 11 <= dt.hour <= 14
         
-        if day_key not in days:
-            days[day_key] = []
-            
-        days[day_key].append(item)
+        current = days.get(day)
+        if current is None or (is_mid_day and not current[1]):
+            days[day] = (item, is_mid_day)
     
     # Format output
-    output = [f"\n{Fore.CYAN}5-Day Forecast for {forecast_data.get('city', {}).get('name')}:{Style.RESET_ALL}"]
+    output = [f"\n{_CYAN}5-Day Forecast for {forecast_data.get('city', {}).get('name')}:{_RESET}"]
     
-    for day_key in sorted(days.keys()):
-        day_items = days[day_key]
-        day_date = datetime.strptime(day_key, '%Y-%m-%d')
-        day_name = day_date.strftime('%A')
-        
-        # Get mid-day forecast for the day (around noon)
-        mid_day = None
-        for item in day_items:
-            item_hour = datetime.fromtimestamp(item['dt']).hour
-            if 11 <= item_hour <= 14:
-                mid_day = item
-                break
+    for day in sorted(days):
+        mid_day = days[day][0]
+        temp = mid_day['main']['temp']
+        weather = mid_day['weather'][0]['description']
         
-        # If no mid-day forecast, use the first one
-        if not mid_day and day_items:
-            mid_day = day_items[0]
-            
-        if mid_day:
-            temp = mid_day['main']['temp']
-            weather = mid_day['weather'][0]['description'] 
-            item_time = datetime.fromtimestamp(mid_day['dt']).strftime('%H:%M')
-            
-            output.append(f"{Fore.YELLOW}{day_name} ({day_date.strftime('%d %b')}):{Style.RESET_ALL} {Fore.WHITE}{temp}°C, {weather}{Style.RESET_ALL}")
+        output.append(f"{_YELLOW}{day.strftime('%A')} ({day.strftime('%d %b')}):{_RESET} {_WHITE}{temp}°C, {weather}{_RESET}")
     
     return "\n".join(output)
\ No newline at end of file
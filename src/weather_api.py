@@ -1,18 +1,396 @@
 import requests
-from typing import Dict, Any, Optional, Tuple, List
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+from typing import Dict, Any, Optional, Tuple, List, Callable, NoReturn
 import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from .utils import load_env_variable
+from .geocode_cache import GeocodeCache
+
+# Seconds between consecutive /forecast points
+_FORECAST_STEP = 3 * 3600
+
+# Fields of each /forecast list entry that the app uses: the time, the
+# main readings (temp, feels_like, humidity), the conditions and the wind.
+# Everything else is dropped after parsing, so add a field here before
+# reading it from a forecast point.
+_FORECAST_FIELDS = ("dt", "main", "weather", "wind")
+
+def _prune_forecast(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a /forecast response with each list entry reduced to _FORECAST_FIELDS."""
+    pruned = dict(data)
+    pruned['list'] = [
+        {field: item[field] for field in _FORECAST_FIELDS if field in item}
+        for item in data.get('list', [])
+    ]
+    return pruned
+
+def _from_onecall_point(point: Dict[str, Any], name: str, country: str, lat: float, lon: float) -> Dict[str, Any]:
+    """
+    Convert a One Call "current" or "hourly" point to the shape of a
+    /weather response. One Call doesn't report the place name or
+    country, so they are passed in.
+    """
+    return {
+        'dt': point.get('dt'),
+        'main': {
+            'temp': point.get('temp'),
+            'feels_like': point.get('feels_like'),
+            'humidity': point.get('humidity')
+        },
+        'wind': {'speed': point.get('wind_speed')},
+        'weather': point.get('weather', []),
+        'name': name,
+        'sys': {'country': country},
+        'coord': {'lat': lat, 'lon': lon}
+    }
+
+def select_forecast(data: Dict[str, Any], hours_ahead: int) -> Dict[str, Any]:
+    """
+    Pick the forecast point closest to hours_ahead from a /forecast response.
+    
+    Args:
+        data: Forecast response
+        hours_ahead: Hours ahead to forecast
+        
+    Returns:
+        Copy of the forecast point with the city's name, country and
+        coordinates added, or an empty dict if there are no points
+    """
+    forecasts = data.get('list', [])
+    if not forecasts:
+        return {}
+    
+    # Points are on a fixed 3-hour grid starting at the first one, so the
+    # closest point to the requested time can be computed directly, in
+    # whole epoch seconds like the points' "dt"
+    target_ts = int(time.time()) + hours_ahead * 3600
+    index = (target_ts - forecasts[0]['dt'] + _FORECAST_STEP // 2) // _FORECAST_STEP
+    forecast_data = forecasts[max(0, min(len(forecasts) - 1, index))]
+    if not forecast_data:
+        return {}
+    
+    # Add city information to a copy of the point, so a cached response isn't modified
+    forecast_data = dict(forecast_data)
+    forecast_data['name'] = data.get('city', {}).get('name')
+    forecast_data['sys'] = {'country': data.get('city', {}).get('country')}
+    forecast_data['coord'] = data.get('city', {}).get('coord')
+    return forecast_data
 
 class WeatherAPI:
     """
     Handles all interactions with the OpenWeatherMap API.
     """
     
+    # Default seconds a response is served from cache, overridden by
+    # WEATHER_CACHE_TTL and FORECAST_CACHE_TTL. Current conditions change
+    # roughly hourly and forecasts every few hours.
+    CURRENT_TTL = 600
+    FORECAST_TTL = 1800
+    
+    # Seconds past its ttl that a response is still served while a fresh
+    # one is fetched in the background. Not used when the ttl is 0.
+    STALE_TTL = 600
+    
+    # Maximum number of cached responses
+    CACHE_MAXSIZE = 256
+    
+    # (connect, read) timeouts in seconds. The connect timeout is just over
+    # the 3 s TCP retransmission interval, so one lost SYN is retried; the
+    # read timeout bounds a stalled response so it can't hold a pooled
+    # connection forever. Overridden by OWM_HTTP_TIMEOUT.
+    DEFAULT_TIMEOUT = (3.05, 10)
+    
+    # Maximum number of concurrent requests made by the batch methods
+    BATCH_WORKERS = 8
+    
     def __init__(self):
         """Initialize the WeatherAPI with API key from environment variables."""
         self.api_key = load_env_variable("OPENWEATHERMAP_API_KEY")
         self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.onecall_url = "https://api.openweathermap.org/data/3.0/onecall"
+        self._url_current = f"{self.base_url}/weather"
+        self._url_forecast = f"{self.base_url}/forecast"
+        
+        # One Call 3.0 needs a separate subscription, so it is opt-in.
+        # It is switched off again if the API key isn't authorized for it.
+        self.use_onecall = load_env_variable("OWM_ONECALL", "0") == "1"
+        
+        # How long responses are fresh; 0 revalidates on every call
+        self.current_ttl = float(load_env_variable("WEATHER_CACHE_TTL", str(self.CURRENT_TTL)))
+        self.forecast_ttl = float(load_env_variable("FORECAST_CACHE_TTL", str(self.FORECAST_TTL)))
+        
+        self.timeout = self._parse_timeout(load_env_variable("OWM_HTTP_TIMEOUT", ""))
+        
+        # Reuse one session so calls share pooled keep-alive connections
+        # instead of opening a new TCP+TLS connection each time
+        self.session = requests.Session()
+        
+        # A larger pool for concurrent callers, and retries with backoff for
+        # rate limiting and transient server errors. The last response is
+        # kept when retries run out, so error messages still see its status.
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+                raise_on_status=False
+            )
+        ))
+        
+        # Query parameters and headers sent with every request, merged in by
+        # the session; metric units give Celsius
+        self.session.params = {"appid": self.api_key, "units": "metric"}
+        self.session.headers.update({
+            "Accept-Encoding": "gzip",
+            "User-Agent": "WeatherWear/1.0"
+        })
+        
+        # Coordinates of previously resolved location names, persisted across runs
+        self.geocode_cache = GeocodeCache()
+        
+        # Responses keyed by request, as (fetched_at, data, validators), where
+        # validators are the conditional request headers built from the
+        # response's ETag and Last-Modified. Expired entries are kept so they
+        # can be revalidated, or served if a refresh fails.
+        self._cache: Dict[tuple, Tuple[float, Any, Dict[str, str]]] = {}
+        self._cache_lock = threading.Lock()
+        
+        # Background refreshes of stale responses, at most one per key
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
+        
+        # Requests being made, so concurrent callers for the same key wait
+        # for that response instead of sending their own
+        self._inflight: Dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+    def _parse_timeout(self, value: str) -> Tuple[float, float]:
+        """
+        Parse OWM_HTTP_TIMEOUT: "connect,read", or a single value used for both.
+        An empty or invalid value gives DEFAULT_TIMEOUT.
+        """
+        if not value:
+            return self.DEFAULT_TIMEOUT
+        connect, _, read = value.partition(",")
+        try:
+            timeout = (float(connect), float(read or connect))
+        except ValueError:
+            timeout = None
+        if timeout is None or min(timeout) <= 0:
+            print(f"Invalid OWM_HTTP_TIMEOUT {value!r}, using the default {self.DEFAULT_TIMEOUT}")
+            return self.DEFAULT_TIMEOUT
+        return timeout
+        
+    def close(self):
+        """Close the HTTP session and its pooled connections."""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
+    def _get_json(self, endpoint: str, params: Dict[str, Any], ttl: float, transform: Callable[[Any], Any] = None) -> Any:
+        """
+        GET an endpoint and decode the JSON body, serving cached responses
+        younger than ttl seconds. If given, transform is applied to the
+        decoded body before it is cached.
+        A response up to STALE_TTL seconds past its ttl is still returned
+        right away, and refreshed in the background for the next caller.
+        If the request fails, the last response for it is returned even if
+        stale; the RequestException is raised only if there is none.
+        """
+        key = self._cache_key(endpoint, params)
+        cached = self._cache.get(key)
+        if cached is not None:
+            age = time.monotonic() - cached[0]
+            if age < ttl:
+                return cached[1]
+            if ttl > 0 and age < ttl + self.STALE_TTL:
+                # Serve the stale response while it is refreshed in the background,
+                # or fetch it below if a refresh can't be started
+                if self._refresh_in_background(key, endpoint, params, transform):
+                    return cached[1]
+        
+        try:
+            return self._fetch(key, endpoint, params, transform)
+        except requests.exceptions.RequestException:
+            if cached is not None:
+                return cached[1]
+            raise
+        
+    @staticmethod
+    def _cache_key(endpoint: str, params: Dict[str, Any]) -> tuple:
+        """Build the response cache key for a request."""
+        return (endpoint, params.get("q"), params.get("lat"), params.get("lon"), params.get("cnt"))
+        
+    def _fetch(self, key: tuple, endpoint: str, params: Dict[str, Any], transform: Callable[[Any], Any] = None) -> Any:
+        """
+        Fetch and cache the response for key. If the same request is already
+        being made by another thread, wait for its result instead.
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = self._inflight[key] = Future()
+        
+        if not is_owner:
+            return future.result()
+        
+        try:
+            data = self._request(key, endpoint, params, transform)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+        
+    def _request(self, key: tuple, endpoint: str, params: Dict[str, Any], transform: Callable[[Any], Any] = None) -> Any:
+        """
+        GET an endpoint, decode the JSON body and cache it under key.
+        A cached response is revalidated with a conditional request, and
+        reused without downloading or parsing the body if it is unchanged.
+        """
+        cached = self._cache.get(key)
+        response = self.session.get(
+            endpoint,
+            params=params,
+            headers=cached[2] if cached is not None else None,
+            timeout=self.timeout
+        )
+        if response.status_code == 304 and cached is not None:
+            # Not modified; keep the cached data and restart its ttl
+            self._store(key, cached[1], cached[2])
+            return cached[1]
+        response.raise_for_status()  # Raise exception for 4XX/5XX responses
+        
+        # orjson parses the raw bytes directly, much faster than response.json().
+        # A bad body is still reported as a RequestException, as before.
+        try:
+            data = orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
+            raise requests.exceptions.InvalidJSONError(str(e), response=response)
+        
+        if transform is not None:
+            data = transform(data)
+        
+        validators = {}
+        if "ETag" in response.headers:
+            validators["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        
+        self._store(key, data, validators)
+        return data
+        
+    def _store(self, key: tuple, data: Any, validators: Dict[str, str]) -> None:
+        """Cache a response as fetched now, evicting the oldest entry if the cache is full."""
+        # Re-insert so the dict stays ordered oldest first, then evict the oldest
+        with self._cache_lock:
+            self._cache.pop(key, None)
+            self._cache[key] = (time.monotonic(), data, validators)
+            if len(self._cache) > self.CACHE_MAXSIZE:
+                del self._cache[next(iter(self._cache))]
+        
+    def _refresh_in_background(self, key: tuple, endpoint: str, params: Dict[str, Any], transform: Callable[[Any], Any] = None) -> bool:
+        """
+        Start refreshing a cached response on the executor, unless a refresh of it is already running.
+        
+        Returns:
+            False if the refresh couldn't be started because the executor was shut down by close()
+        """
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return True
+            self._refreshing.add(key)
+        try:
+            self._executor.submit(self._refresh, key, endpoint, params, transform)
+        except RuntimeError:
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+            return False
+        return True
+        
+    def _refresh(self, key: tuple, endpoint: str, params: Dict[str, Any], transform: Callable[[Any], Any] = None) -> None:
+        """Refresh a cached response. On failure the stale response stays cached."""
+        try:
+            self._fetch(key, endpoint, params, transform)
+        except requests.exceptions.RequestException:
+            pass
+        finally:
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+        
+    def _raise_from(self, e: requests.exceptions.RequestException, location: str, kind: str) -> NoReturn:
+        """
+        Raise a user-facing ValueError for a failed request.
+        
+        Args:
+            e: The request error
+            location: Location that was queried
+            kind: What was being fetched, e.g. "weather data"
+        """
+        # Check for specific error responses from the API
+        response = e.response
+        if response is not None:
+            if response.status_code == 404:
+                raise ValueError(f"Location '{location}' not found. Please check spelling and try again.")
+            if response.status_code == 401:
+                raise ValueError("Invalid API key. Please check your OpenWeatherMap API key.")
+        raise ValueError(f"Failed to fetch {kind}: {str(e)}")
+        
+    def _lookup_coords(self, location: str, lat: float = None, lon: float = None) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Return the coordinates to query by: the given ones, else those of a
+        name resolved before, so the API can skip geocoding it again.
+        Returns (None, None) if neither is known.
+        """
+        if lat is not None and lon is not None:
+            return lat, lon
+        return self.geocode_cache.get(location) or (None, None)
+        
+    def _remember_coords(self, location: str, coord: Optional[Dict[str, float]], name: str, country: str, endpoint: str, params: Dict[str, Any]) -> None:
+        """
+        Remember where a location name resolved to, from a response's "coord".
+        
+        Args:
+            location: Location name that was queried
+            coord: The response's coordinates
+            name: The response's place name
+            country: The response's country code
+            endpoint: Endpoint that was queried
+            params: Query parameters of the name-based request
+        """
+        if not coord:
+            return
+        self.geocode_cache.set(location, coord['lat'], coord['lon'], name, country)
+        
+        # Later lookups of the name query by these coordinates, so cache the
+        # response under them too instead of fetching it again
+        cached = self._cache.get(self._cache_key(endpoint, params))
+        if cached is not None:
+            coord_params = {"lat": coord['lat'], "lon": coord['lon'], "cnt": params.get("cnt")}
+            self._store(self._cache_key(endpoint, coord_params), cached[1], cached[2])
+        
+    def _location_params(self, location: str, lat: float = None, lon: float = None) -> Dict[str, Any]:
+        """Choose between coordinates or city name based on what's provided."""
+        if lat is not None and lon is not None:
+            return {"lat": lat, "lon": lon}
+        return {"q": location}
         
     def get_current_weather(self, location: str, lat: float = None, lon: float = None) -> Dict[str, Any]:
         """
@@ -26,35 +404,37 @@ class WeatherAPI:
         Returns:
             Dictionary containing weather data
         """
-        endpoint = f"{self.base_url}/weather"
-        
-        # Choose between coordinates or city name based on what's provided
-        params = {
-            "appid": self.api_key,
-            "units": "metric"  # Use metric units (Celsius)
-        }
-        
-        if lat is not None and lon is not None:
-            params["lat"] = lat
-            params["lon"] = lon
-        else:
-            params["q"] = location
+        lat, lon = known = self._lookup_coords(location, lat, lon)
+        params = self._location_params(location, lat, lon)
         
         try:
-            response = requests.get(endpoint, params=params)
-            response.raise_for_status()  # Raise exception for 4XX/5XX responses
-            return response.json()
+            data = self._get_json(self._url_current, params, self.current_ttl)
         except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to fetch weather data: {str(e)}"
+            self._raise_from(e, location, "weather data")
+        
+        if known == (None, None):
+            self._remember_coords(
+                location, data.get('coord'), data.get('name'), data.get('sys', {}).get('country'),
+                self._url_current, params
+            )
+        return data
             
-            # Check for specific error responses from the API
-            if hasattr(e, 'response') and e.response is not None:
-                if e.response.status_code == 404:
-                    error_msg = f"Location '{location}' not found. Please check spelling and try again."
-                elif e.response.status_code == 401:
-                    error_msg = "Invalid API key. Please check your OpenWeatherMap API key."
+    def get_current_weather_batch(self, locations: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get current weather for several locations, fetching them concurrently
+        over the shared session.
+        
+        Args:
+            locations: Names of the cities/locations
             
-            raise ValueError(error_msg)
+        Returns:
+            Weather data for each location, in order
+        """
+        if not locations:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.BATCH_WORKERS, len(locations))) as executor:
+            return list(executor.map(self.get_current_weather, locations))
             
     def get_forecast(self, location: str, hours_ahead: int = 24, lat: float = None, lon: float = None) -> Dict[str, Any]:
         """
@@ -69,57 +449,63 @@ class WeatherAPI:
         Returns:
             Dictionary containing forecast data
         """
-        endpoint = f"{self.base_url}/forecast"
+        lat, lon = known = self._lookup_coords(location, lat, lon)
+        params = self._location_params(location, lat, lon)
+        params["cnt"] = 8  # Get up to 8 forecast points (24 hours, every 3 hours)
+        
+        try:
+            data = self._get_json(self._url_forecast, params, self.forecast_ttl, _prune_forecast)
+        except requests.exceptions.RequestException as e:
+            self._raise_from(e, location, "forecast data")
+        
+        if known == (None, None):
+            city = data.get('city', {})
+            self._remember_coords(
+                location, city.get('coord'), city.get('name'), city.get('country'),
+                self._url_forecast, params
+            )
+        return select_forecast(data, hours_ahead)
+            
+    def get_onecall(self, lat: float, lon: float) -> Dict[str, Any]:
+        """
+        Get current and hourly weather for coordinates in one call (One Call API 3.0).
         
-        # Choose between coordinates or city name based on what's provided
+        Args:
+            lat: Latitude
+            lon: Longitude
+            
+        Returns:
+            One Call response with "current", "hourly" and "daily" data
+        """
+        # Coordinates are rounded (~1 km) so nearby lookups share a cache entry
         params = {
-            "appid": self.api_key,
-            "units": "metric",
-            "cnt": 8  # Get up to 8 forecast points (24 hours, every 3 hours)
+            "lat": round(lat, 2),
+            "lon": round(lon, 2),
+            "exclude": "minutely,alerts"
         }
         
-        if lat is not None and lon is not None:
-            params["lat"] = lat
-            params["lon"] = lon
-        else:
-            params["q"] = location
-        
         try:
-            response = requests.get(endpoint, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Find the forecast closest to the requested hours ahead
-            target_time = datetime.now() + timedelta(hours=hours_ahead)
-            
-            # Extract the relevant forecast point
-            forecast_data = None
-            closest_diff = float('inf')
-            
-            for forecast in data.get('list', []):
-                forecast_time = datetime.fromtimestamp(forecast['dt'])
-                time_diff = abs((forecast_time - target_time).total_seconds())
-                
-                if time_diff < closest_diff:
-                    closest_diff = time_diff
-                    forecast_data = forecast
-            
-            # Add city information to the forecast
-            if forecast_data:
-                forecast_data['name'] = data.get('city', {}).get('name')
-                forecast_data['sys'] = {'country': data.get('city', {}).get('country')}
-                
-            return forecast_data or {}
-            
+            return self._get_json(self.onecall_url, params, self.current_ttl)
         except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to fetch forecast data: {str(e)}"
+            if e.response is not None and e.response.status_code == 401:
+                # Not subscribed to One Call; use the 2.5 endpoints from now on
+                self.use_onecall = False
+                raise ValueError("API key is not authorized for One Call 3.0.")
+            raise ValueError(f"Failed to fetch One Call data: {str(e)}")
             
-            # Check for specific error responses
-            if hasattr(e, 'response') and e.response is not None:
-                if e.response.status_code == 404:
-                    error_msg = f"Location '{location}' not found. Please check spelling and try again."
-                    
-            raise ValueError(error_msg)
+    def _get_weather_from_onecall(self, name: str, country: str, is_future: bool, hours_offset: int, lat: float, lon: float) -> Dict[str, Any]:
+        """Get current or forecast weather from One Call, in the shape of a /weather response."""
+        data = self.get_onecall(lat, lon)
+        
+        point = data.get('current', {})
+        hourly = data.get('hourly', [])
+        if is_future and hours_offset > 0 and hourly:
+            # Hourly points start at the current hour, one per hour
+            target_ts = int(time.time()) + hours_offset * 3600
+            index = (target_ts - hourly[0]['dt'] + 1800) // 3600
+            point = hourly[max(0, min(len(hourly) - 1, index))]
+        
+        return _from_onecall_point(point, name, country, lat, lon)
             
     def get_weather_for_query(self, location: str, is_future: bool, hours_offset: int, lat: float = None, lon: float = None) -> Dict[str, Any]:
         """
@@ -135,10 +521,29 @@ class WeatherAPI:
         Returns:
             Weather data dictionary
         """
+        # Place shown for One Call results, which don't include it: the
+        # caller's name for coordinates it passed, else the name and country
+        # the location resolved to before
+        if lat is not None and lon is not None:
+            place = (location, "")
+        else:
+            place = self.geocode_cache.get_place(location)
+        
+        # Look up names resolved on an earlier run by coordinates, skipping
+        # the server-side geocoding of the name
+        lat, lon = self._lookup_coords(location, lat, lon)
+        
+        # With known coordinates and place, One Call answers both current and forecast queries
+        if lat is not None and place is not None and self.use_onecall:
+            try:
+                return self._get_weather_from_onecall(*place, is_future, hours_offset, lat, lon)
+            except ValueError:
+                # Fall back to the 2.5 endpoints below
+                pass
+        
         if is_future and hours_offset > 0:
             return self.get_forecast(location, hours_offset, lat, lon)
-        else:
-            return self.get_current_weather(location, lat, lon)
+        return self.get_current_weather(location, lat, lon)
             
     def get_multi_day_forecast(self, location: str, lat: float = None, lon: float = None) -> Dict[str, Any]:
         """
@@ -152,30 +557,19 @@ class WeatherAPI:
         Returns:
             Full forecast data
         """
-        endpoint = f"{self.base_url}/forecast"
-        
-        # Choose between coordinates or city name based on what's provided
-        params = {
-            "appid": self.api_key,
-            "units": "metric",
-        }
-        
-        if lat is not None and lon is not None:
-            params["lat"] = lat
-            params["lon"] = lon
-        else:
-            params["q"] = location
+        lat, lon = known = self._lookup_coords(location, lat, lon)
+        params = self._location_params(location, lat, lon)
+        params["cnt"] = 40  # All 5 days of 3-hour forecast points
         
         try:
-            response = requests.get(endpoint, params=params)
-            response.raise_for_status()
-            return response.json()
+            data = self._get_json(self._url_forecast, params, self.forecast_ttl, _prune_forecast)
         except requests.exceptions.RequestException as e:
-            error_msg = f"Failed to fetch multi-day forecast: {str(e)}"
-            
-            # Check for specific error responses
-            if hasattr(e, 'response') and e.response is not None:
-                if e.response.status_code == 404:
-                    error_msg = f"Location '{location}' not found. Please check spelling and try again."
-                    
-            raise ValueError(error_msg)
\ No newline at end of file
+            self._raise_from(e, location, "multi-day forecast")
+        
+        if known == (None, None):
+            city = data.get('city', {})
+            self._remember_coords(
+                location, city.get('coord'), city.get('name'), city.get('country'),
+                self._url_forecast, params
+            )
+        return data
\ No newline at end of file
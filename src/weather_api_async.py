@@ -0,0 +1,133 @@
+import asyncio
+from typing import Dict, Any, List
+import aiohttp
+import orjson
+from .utils import load_env_variable
+from .weather_api import select_forecast, _prune_forecast
+
+class AsyncWeatherAPI:
+    """
+    Async counterpart of WeatherAPI, for fetching weather for many
+    locations concurrently on one event loop.
+    
+    Use as an async context manager so the HTTP session is closed:
+
+        async with AsyncWeatherAPI() as api:
+            results = await api.get_many(["London", "Paris"])
+    """
+    
+    def __init__(self):
+        """Initialize the AsyncWeatherAPI with API key from environment variables."""
+        self.api_key = load_env_variable("OPENWEATHERMAP_API_KEY")
+        self.base_url = "https://api.openweathermap.org"
+        self.session = None
+    
+    async def __aenter__(self):
+        # One session with a shared connection pool and cached DNS lookups
+        self.session = aiohttp.ClientSession(
+            base_url=self.base_url,
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=15, connect=3.05)
+        )
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.session.close()
+        self.session = None
+    
+    def _params(self, location: str, lat: float = None, lon: float = None) -> Dict[str, Any]:
+        """Build query parameters, choosing between coordinates or city name based on what's provided."""
+        params = {
+            "appid": self.api_key,
+            "units": "metric"  # Use metric units (Celsius)
+        }
+        
+        if lat is not None and lon is not None:
+            params["lat"] = lat
+            params["lon"] = lon
+        else:
+            params["q"] = location
+        return params
+    
+    async def _get_json(self, path: str, params: Dict[str, Any], location: str, what: str) -> Any:
+        """
+        GET an API path and decode the JSON body.
+        Errors are raised as ValueError with the same messages as WeatherAPI.
+        """
+        try:
+            async with self.session.get(path, params=params) as response:
+                response.raise_for_status()  # Raise exception for 4XX/5XX responses
+                
+                # Parse the raw bytes; response.json() would decode them to a str first
+                return orjson.loads(await response.read())
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                raise ValueError(f"Location '{location}' not found. Please check spelling and try again.")
+            if e.status == 401:
+                raise ValueError("Invalid API key. Please check your OpenWeatherMap API key.")
+            raise ValueError(f"Failed to fetch {what}: {str(e)}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            raise ValueError(f"Failed to fetch {what}: {str(e)}")
+    
+    async def get_current_weather(self, location: str, lat: float = None, lon: float = None) -> Dict[str, Any]:
+        """
+        Get current weather data for a given location.
+        
+        Args:
+            location: Name of the city/location
+            lat: Optional latitude for coordinate-based lookup
+            lon: Optional longitude for coordinate-based lookup
+        
+        Returns:
+            Dictionary containing weather data
+        """
+        params = self._params(location, lat, lon)
+        return await self._get_json("/data/2.5/weather", params, location, "weather data")
+    
+    async def get_forecast(self, location: str, hours_ahead: int = 24, lat: float = None, lon: float = None) -> Dict[str, Any]:
+        """
+        Get weather forecast for a given location.
+        
+        Args:
+            location: Name of the city/location
+            hours_ahead: Hours ahead to forecast
+            lat: Optional latitude for coordinate-based lookup
+            lon: Optional longitude for coordinate-based lookup
+        
+        Returns:
+            Dictionary containing forecast data
+        """
+        params = self._params(location, lat, lon)
+        params["cnt"] = 8  # Get up to 8 forecast points (24 hours, every 3 hours)
+        data = await self._get_json("/data/2.5/forecast", params, location, "forecast data")
+        return select_forecast(_prune_forecast(data), hours_ahead)
+    
+    async def get_multi_day_forecast(self, location: str, lat: float = None, lon: float = None) -> Dict[str, Any]:
+        """
+        Get a 5-day forecast with 3-hour step.
+        
+        Args:
+            location: Name of the city/location
+            lat: Optional latitude for coordinate-based lookup
+            lon: Optional longitude for coordinate-based lookup
+        
+        Returns:
+            Full forecast data
+        """
+        params = self._params(location, lat, lon)
+        params["cnt"] = 40  # All 5 days of 3-hour forecast points
+        data = await self._get_json("/data/2.5/forecast", params, location, "multi-day forecast")
+        return _prune_forecast(data)
+    
+    async def get_many(self, locations: List[str]) -> List[Any]:
+        """
+        Get current weather for several locations concurrently.
+        
+        Returns:
+            One entry per location, in order: the weather data, or the
+            ValueError raised for that location
+        """
+        return await asyncio.gather(
+            *(self.get_current_weather(location) for location in locations),
+            return_exceptions=True
+        )